@@ -1,11 +1,24 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+
+from config.changelist import EstimatedCountChangelistMixin
+from config.csv_export import csv_chunks, streaming_csv_response
+from config.db_router import ReplicaChangelistMixin
+from courses.export import USER_COLUMNS
 from .models import CustomUser
 
 @admin.register(CustomUser)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(ReplicaChangelistMixin, EstimatedCountChangelistMixin, UserAdmin):
     fieldsets = UserAdmin.fieldsets + (
         ("Roles", {"fields": ("is_student", "is_teacher", "is_authorized")}),
     )
     list_display = ("username", "email", "is_student", "is_teacher", "is_staff", "is_superuser", "is_authorized")
-    list_filter = ("is_student", "is_teacher", "is_staff", "is_superuser", "is_authorized")
+    list_filter = ("is_student", "is_teacher", "is_staff", "is_superuser", "is_authorized", "date_joined")
+    # ✅ prefix matches on indexed columns (migration 0006) instead of icontains scans
+    search_fields = ("^username", "^email")
+    changelist_query_budget = 4
+    actions = ("export_csv",)
+
+    @admin.action(description="Export selected users to CSV")
+    def export_csv(self, request, queryset):
+        return streaming_csv_response(request, csv_chunks(queryset, USER_COLUMNS), "users.csv")
@@ -0,0 +1,81 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.crypto import constant_time_compare
+
+from config.cache import cache_is_shared
+
+USER_SNAPSHOT_TIMEOUT = getattr(settings, "USER_SNAPSHOT_CACHE_TIMEOUT", 15 * 60)
+# per-process cache: a deactivation or password change in another worker
+# never reaches it, so snapshots only live seconds
+LOCAL_USER_SNAPSHOT_TIMEOUT = getattr(settings, "LOCAL_USER_SNAPSHOT_CACHE_TIMEOUT", 5)
+
+# ✅ what views actually read off request.user; anything else is loaded
+# from the DB on first access (deferred field)
+SNAPSHOT_FIELDS = (
+    "id",
+    "username",
+    "first_name",
+    "middle_name",
+    "last_name",
+    "email",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "is_student",
+    "is_teacher",
+    "is_authorized",
+)
+
+
+def _user_snapshot_key(user_id):
+    return f"accounts:user_snapshot:{user_id}"
+
+
+def invalidate_user_snapshot(*user_ids):
+    keys = [_user_snapshot_key(user_id) for user_id in user_ids]
+    if not keys:
+        return
+
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def _from_snapshot(snapshot):
+    from .models import CustomUser
+
+    return CustomUser.from_db("default", SNAPSHOT_FIELDS, [snapshot[f] for f in SNAPSHOT_FIELDS])
+
+
+def get_cached_user(request):
+    """
+    Like django.contrib.auth.get_user(), but serves the user from a cached
+    snapshot when the session's auth hash still matches the fingerprint of
+    the password hash stored with it. Any mismatch or miss falls back to
+    the full lookup, which also flushes sessions that are no longer valid.
+    """
+    user_id = request.session.get(SESSION_KEY)
+    if user_id is None:
+        return AnonymousUser()
+
+    key = _user_snapshot_key(user_id)
+    snapshot = cache.get(key)
+    if (
+        snapshot is not None
+        # ✅ the same checks auth.get_user() makes: a backend still configured,
+        # an active user and a session hash matching the password hash
+        and request.session.get(BACKEND_SESSION_KEY) in settings.AUTHENTICATION_BACKENDS
+        and snapshot["is_active"]
+        and constant_time_compare(request.session.get(HASH_SESSION_KEY, ""), snapshot["auth_hash"])
+    ):
+        return _from_snapshot(snapshot)
+
+    user = auth.get_user(request)
+    if user.is_authenticated:
+        snapshot = {f: getattr(user, f) for f in SNAPSHOT_FIELDS}
+        snapshot["auth_hash"] = user.get_session_auth_hash()
+        cache.set(key, snapshot, USER_SNAPSHOT_TIMEOUT if cache_is_shared() else LOCAL_USER_SNAPSHOT_TIMEOUT)
+    return user
@@ -0,0 +1,217 @@
+import csv
+import os
+import secrets
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Upper
+from django.utils import timezone
+
+from accounts.models import CustomUser
+from courses.cache import invalidate_enrollment_state
+from courses.events import publish_enrollment_change
+from courses.models import Course, Enrollment
+
+REQUIRED_COLUMNS = ("username", "email")
+
+
+def _init_worker():
+    # spawned (non-fork) workers start without settings
+    import django
+
+    django.setup()
+
+
+def read_roster(path):
+    """Yield (line number, row) from the CSV, one row at a time."""
+    try:
+        roster = open(path, newline="", encoding="utf-8-sig")
+    except OSError as exc:
+        raise CommandError(f"Cannot read {path}: {exc}")
+
+    with roster:
+        reader = csv.DictReader(roster)
+        columns = {name.strip().lower() for name in reader.fieldnames or ()}
+        missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+        if missing:
+            raise CommandError(f"{path} is missing column(s): {', '.join(missing)}")
+
+        for row in reader:
+            yield reader.line_num, {
+                key.strip().lower(): (value or "").strip() for key, value in row.items() if key is not None
+            }
+
+
+class Command(BaseCommand):
+    help = (
+        "Create verified student accounts from a CSV roster (username, email and optional "
+        "password, first_name, middle_name, last_name columns), optionally enrolling them "
+        "in a course. Existing student usernames with the same email are only enrolled; rows "
+        "that conflict with another account's username or email are skipped and reported, "
+        "so re-running is safe."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("roster", help="Path to the roster CSV")
+        parser.add_argument("--course", help="Slug of the course to enroll every student in")
+        parser.add_argument("--approve", action="store_true", help="Approve the enrollments (needs --course)")
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Password-hashing processes",
+        )
+
+    def handle(self, *args, **options):
+        if options["approve"] and not options["course"]:
+            raise CommandError("--approve needs --course")
+
+        course = None
+        if options["course"]:
+            course = Course.objects.filter(slug=options["course"]).first()
+            if course is None:
+                raise CommandError(f"No course with slug {options['course']!r}")
+
+        self.course = course
+        self.approve = options["approve"]
+        self.totals = dict(created=0, existing=0, skipped=0, enrolled=0, approved=0)
+
+        started = time.monotonic()
+        rows = read_roster(options["roster"])
+        # ✅ PBKDF2 is CPU-bound: one process per core, not threads behind the GIL
+        with ProcessPoolExecutor(max_workers=max(1, options["workers"]), initializer=_init_worker) as pool:
+            while batch := list(islice(rows, options["batch_size"])):
+                try:
+                    self.import_batch(batch, pool, options["workers"])
+                except IntegrityError as exc:
+                    # someone signed up with one of these names since the check
+                    raise CommandError(
+                        f"Batch ending at line {batch[-1][0]} failed ({exc}); earlier batches were "
+                        "saved, re-run the command to continue."
+                    )
+
+        t = self.totals
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Created {t['created']} student(s), {t['existing']} already existed, {t['skipped']} row(s) "
+                f"skipped; {t['enrolled']} enrollment(s) created, {t['approved']} approved, "
+                f"in {time.monotonic() - started:.1f}s."
+            )
+        )
+
+    def valid_rows(self, batch):
+        seen = set()
+        for line, row in batch:
+            username, email = row.get("username", ""), row.get("email", "").lower()
+            try:
+                CustomUser.username_validator(username)
+                validate_email(email)
+            except ValidationError as exc:
+                self.skip(line, "; ".join(exc.messages))
+                continue
+            if username.upper() in seen or email.upper() in seen:
+                self.skip(line, "duplicate of an earlier row")
+                continue
+            seen.update((username.upper(), email.upper()))
+            yield line, username, email, row
+
+    def skip(self, line, reason):
+        self.totals["skipped"] += 1
+        self.stderr.write(f"line {line}: skipped ({reason})")
+
+    def import_batch(self, batch, pool, workers):
+        rows = list(self.valid_rows(batch))
+        if not rows:
+            return
+
+        # ✅ one indexed lookup per batch (Upper matches signup's case-insensitive check)
+        usernames = {username.upper() for _, username, _, _ in rows}
+        emails = {email.upper() for _, _, email, _ in rows}
+        existing = list(
+            CustomUser.objects.annotate(username_upper=Upper("username"), email_upper=Upper("email"))
+            .filter(Q(username_upper__in=usernames) | Q(email_upper__in=emails))
+            .values_list("pk", "username_upper", "email_upper", "is_student")
+        )
+        by_username = {username: (pk, is_student, email) for pk, username, email, is_student in existing}
+        taken_emails = {email for _, _, email, _ in existing}
+
+        new_rows, student_ids = [], []
+        for line, username, email, row in rows:
+            match = by_username.get(username.upper())
+            if match is not None:
+                if not match[1]:
+                    self.skip(line, f"{username} exists and is not a student")
+                    continue
+                if match[2] != email.upper():
+                    # ✅ maybe another person: never hand them this account's courses
+                    self.skip(line, f"{username} exists with a different email than {email}")
+                    continue
+                # same student from an earlier run: still enroll them
+                self.totals["existing"] += 1
+                student_ids.append(match[0])
+            elif email.upper() in taken_emails:
+                self.skip(line, f"{email} belongs to another account")
+            else:
+                new_rows.append((username, email, row))
+
+        # ✅ no password: a random one, so the password reset flow (which skips
+        # unusable passwords) still lets the student in
+        passwords = [row.get("password") or secrets.token_urlsafe(24) for _, _, row in new_rows]
+        chunksize = max(1, len(passwords) // (max(1, workers) * 4))
+        hashed = pool.map(make_password, passwords, chunksize=chunksize)
+
+        users = [
+            CustomUser(
+                username=username,
+                email=email,
+                password=password,
+                first_name=row.get("first_name", ""),
+                middle_name=row.get("middle_name", ""),
+                last_name=row.get("last_name", ""),
+                is_student=True,
+                # ✅ the school vouches for the roster: no email verification step
+                is_authorized=True,
+            )
+            for (username, email, row), password in zip(new_rows, hashed)
+        ]
+
+        with transaction.atomic():
+            created = CustomUser.objects.bulk_create(users)
+            self.totals["created"] += len(created)
+            student_ids.extend(user.pk for user in created)
+            if self.course is not None:
+                self.enroll(student_ids)
+
+    def enroll(self, student_ids):
+        already = set(
+            Enrollment.objects.filter(course=self.course, student_id__in=student_ids).values_list(
+                "student_id", flat=True
+            )
+        )
+        now = timezone.now() if self.approve else None
+        new = Enrollment.objects.bulk_create(
+            Enrollment(student_id=student_id, course=self.course, is_approved=self.approve, approved_at=now)
+            for student_id in student_ids
+            if student_id not in already
+        )
+        self.totals["enrolled"] += len(new)
+        self.totals["approved"] += len(new) if self.approve else 0
+
+        if self.approve and already:
+            # pending requests from before: approved (and signalled) the usual way
+            self.totals["approved"] += Enrollment.objects.filter(
+                course=self.course, student_id__in=already
+            ).approve()
+
+        # ✅ bulk_create skips post_save: refresh cached state and open pages ourselves
+        enrolled = [enrollment.student_id for enrollment in new]
+        invalidate_enrollment_state(*enrolled)
+        publish_enrollment_change(*enrolled)
@@ -0,0 +1,31 @@
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired rows from django_session in small chunks "
+        "(a clearsessions that doesn't lock the table for one huge DELETE)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=5000)
+        parser.add_argument("--sleep", type=float, default=0.1, help="Pause between chunks, in seconds")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        expired = Session.objects.filter(expire_date__lt=now)
+        deleted = 0
+
+        while True:
+            keys = list(expired.values_list("session_key", flat=True)[: options["chunk_size"]])
+            if not keys:
+                break
+
+            deleted += Session.objects.filter(session_key__in=keys).delete()[0]
+            time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired session(s)."))
@@ -0,0 +1,108 @@
+import re
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import CustomUser
+
+DURATION_RE = re.compile(r"^(\d+)([dhm])$")
+DURATION_UNITS = {"d": "days", "h": "hours", "m": "minutes"}
+
+
+def parse_duration(value):
+    match = DURATION_RE.match(value.strip())
+    if not match:
+        raise CommandError(f"Invalid --older-than value: {value!r} (use e.g. 7d, 12h or 30m)")
+    amount, unit = match.groups()
+    return timedelta(**{DURATION_UNITS[unit]: int(amount)})
+
+
+def abandoned_signups(cutoff):
+    """
+    Students who never passed student_verify and whose last code expired
+    before ``cutoff`` (signup and resend_code both set a fresh code, so a
+    student still trying to verify is never matched).
+    """
+    return CustomUser.objects.filter(
+        verification_code_expires_at__lt=cutoff,
+        is_student=True,
+        is_authorized=False,
+        is_staff=False,
+        is_superuser=False,
+        last_login__isnull=True,
+    )
+
+
+def stale_codes(now):
+    """Verified users still carrying an expired code (unverified ones keep theirs as the signup marker)."""
+    return CustomUser.objects.filter(verification_code_expires_at__lt=now).filter(
+        Q(is_authorized=True) | Q(is_staff=True) | Q(is_superuser=True)
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete unverified student signups whose verification code expired more than "
+        "--older-than ago, and clear expired codes from verified users, in small chunks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than",
+            default="7d",
+            help="Only delete signups whose last code expired this long ago (e.g. 7d, 12h, 30m)",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument("--sleep", type=float, default=0.1, help="Pause between chunks, in seconds")
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be purged")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        cutoff = now - parse_duration(options["older_than"])
+        chunk_size = options["chunk_size"]
+
+        if options["dry_run"]:
+            self.stdout.write(
+                f"Would delete {abandoned_signups(cutoff).count()} abandoned signup(s) and "
+                f"clear {stale_codes(now).count()} expired verification code(s)."
+            )
+            return
+
+        deleted = cleared = 0
+        last_pk = 0
+
+        # ✅ pk keyset: rows that start verifying mid-run are simply re-checked and skipped
+        while True:
+            ids = list(
+                abandoned_signups(cutoff).filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            last_pk = ids[-1]
+
+            # conditions re-applied: a resend_code since the SELECT moves the row out
+            _, per_model = abandoned_signups(cutoff).filter(pk__in=ids).delete()
+            deleted += per_model.get(CustomUser._meta.label, 0)
+            time.sleep(options["sleep"])
+
+        last_pk = 0
+        while True:
+            ids = list(stale_codes(now).filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:chunk_size])
+            if not ids:
+                break
+            last_pk = ids[-1]
+
+            cleared += stale_codes(now).filter(pk__in=ids).update(
+                verification_code_hash="",
+                verification_code_expires_at=None,
+            )
+            time.sleep(options["sleep"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Deleted {deleted} abandoned signup(s) and cleared {cleared} expired verification code(s)."
+            )
+        )
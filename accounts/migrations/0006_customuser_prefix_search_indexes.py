@@ -0,0 +1,42 @@
+from django.db import migrations
+
+# Indexes for the admin's case-insensitive prefix search (username__istartswith,
+# email__istartswith). Django renders those as UPPER(col) LIKE UPPER('abc%') on
+# Postgres (needs text_pattern_ops) and as LIKE 'abc%' on SQLite (needs a
+# NOCASE index), so the SQL differs per backend.
+FORWARDS = {
+    "postgresql": [
+        "CREATE INDEX customuser_username_prefix_idx ON accounts_customuser (UPPER(username::text) text_pattern_ops)",
+        "CREATE INDEX customuser_email_prefix_idx ON accounts_customuser (UPPER(email::text) text_pattern_ops)",
+    ],
+    "sqlite": [
+        "CREATE INDEX customuser_username_prefix_idx ON accounts_customuser (username COLLATE NOCASE)",
+        "CREATE INDEX customuser_email_prefix_idx ON accounts_customuser (email COLLATE NOCASE)",
+    ],
+}
+BACKWARDS = [
+    "DROP INDEX IF EXISTS customuser_username_prefix_idx",
+    "DROP INDEX IF EXISTS customuser_email_prefix_idx",
+]
+
+
+def create_indexes(apps, schema_editor):
+    for statement in FORWARDS.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor in FORWARDS:
+        for statement in BACKWARDS:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_customuser_username_upper_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
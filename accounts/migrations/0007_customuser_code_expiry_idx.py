@@ -0,0 +1,18 @@
+# Generated by Django 5.2.9 on 2026-10-18 06:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0006_customuser_prefix_search_indexes'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(condition=models.Q(('verification_code_expires_at__isnull', False)), fields=['verification_code_expires_at'], name='customuser_code_expiry_idx'),
+        ),
+    ]
@@ -1,8 +1,36 @@
-from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.conf import settings
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.db import models, transaction
+from django.db.models.functions import Upper
 from django.utils import timezone
 from datetime import timedelta
 import hashlib
+from itertools import islice
+
+from .cache import invalidate_user_snapshot
+
+SNAPSHOT_INVALIDATION_CHUNK = 2000
+
+
+class CustomUserQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        if not settings.CACHED_USER_LOADER:
+            return super().update(**kwargs)
+
+        # ✅ update() skips post_save: drop the cached snapshots of the rows it touches
+        # (is_active, password, ...) so CachedAuthenticationMiddleware sees the change.
+        # Ids are read in chunks before the update, which may change what the filter
+        # matches; each chunk is dropped again once the update commits.
+        with transaction.atomic(using=self.db):
+            ids = self.values_list("pk", flat=True).iterator(chunk_size=SNAPSHOT_INVALIDATION_CHUNK)
+            while chunk := list(islice(ids, SNAPSHOT_INVALIDATION_CHUNK)):
+                invalidate_user_snapshot(*chunk)
+            return super().update(**kwargs)
+
+
+class CustomUserManager(UserManager.from_queryset(CustomUserQuerySet)):
+    pass
+
 
 class CustomUser(AbstractUser):
     middle_name = models.CharField(max_length=150, blank=True)
@@ -14,6 +42,21 @@ class CustomUser(AbstractUser):
     verification_code_hash = models.CharField(max_length=64, blank=True)
     verification_code_expires_at = models.DateTimeField(null=True, blank=True)
 
+    objects = CustomUserManager()
+
+    class Meta(AbstractUser.Meta):
+        swappable = "AUTH_USER_MODEL"
+        indexes = [
+            # ✅ signup's case-insensitive "username taken?" check (username__iexact) on Postgres
+            models.Index(Upper("username"), name="customuser_username_upper_idx"),
+            # ✅ purge_unverified: expired codes / abandoned signups, only rows that have a code
+            models.Index(
+                fields=["verification_code_expires_at"],
+                condition=models.Q(verification_code_expires_at__isnull=False),
+                name="customuser_code_expiry_idx",
+            ),
+        ]
+
     def set_verification_code(self, code: str, minutes_valid: int = 10):
         self.verification_code_hash = hashlib.sha256(code.encode()).hexdigest()
         self.verification_code_expires_at = timezone.now() + timedelta(minutes=minutes_valid)
@@ -0,0 +1,36 @@
+"""
+Session engines that avoid no-op writes.
+
+Django marks a session modified on every ``session[key] = value``, even when
+the value is unchanged, and SessionMiddleware then saves it. These stores
+skip that for unchanged scalar values, so e.g. re-selecting the same
+dashboard course doesn't UPDATE django_session. Pick one with
+SESSION_BACKEND=db|cached_db|cache.
+"""
+
+
+# ✅ only values that can't be mutated in place: a list/dict read from the
+# session, changed and assigned back *is* the stored object, so comparing
+# them would always find "no change" and lose the write
+IMMUTABLE_TYPES = (str, int, float, bool, type(None))
+
+_missing = object()
+
+
+def _unchanged(session, key, value):
+    if type(value) not in IMMUTABLE_TYPES:
+        return False
+    old = session.get(key, _missing)
+    return type(old) is type(value) and old == value
+
+
+class WriteAvoidingSessionMixin:
+    def __setitem__(self, key, value):
+        if _unchanged(self._session, key, value):
+            return
+        super().__setitem__(key, value)
+
+    async def aset(self, key, value):
+        if _unchanged(await self._aget_session(), key, value):
+            return
+        await super().aset(key, value)
@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends.cache import SessionStore as BaseSessionStore
+
+from . import WriteAvoidingSessionMixin
+
+
+class SessionStore(WriteAvoidingSessionMixin, BaseSessionStore):
+    pass
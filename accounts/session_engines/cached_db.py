@@ -0,0 +1,7 @@
+from django.contrib.sessions.backends.cached_db import SessionStore as BaseSessionStore
+
+from . import WriteAvoidingSessionMixin
+
+
+class SessionStore(WriteAvoidingSessionMixin, BaseSessionStore):
+    pass
@@ -1,3 +1,209 @@
-from django.test import TestCase
+import tempfile
+import time
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from config.query_budget import CHANGELIST_SCANS, index_order, paginator_count
+from config.testing import SeededTestCase
+from courses.models import Course, Enrollment
+from .cache import LOCAL_USER_SNAPSHOT_TIMEOUT, get_cached_user
+from .session_engines.db import SessionStore as WriteAvoidingSessionStore
+from .models import CustomUser
+
+
+class UserAdminBudgetTests(SeededTestCase):
+    # ✅ the paginator's COUNT(*) and the index-ordered page may scan; nothing else
+    def test_user_changelist(self):
+        self.assertWithinBudget(
+            self.admin_client, reverse("admin:accounts_customuser_changelist"), allowed_scans=CHANGELIST_SCANS
+        )
+
+    def test_user_changelist_filtered(self):
+        # few unverified students: one page, read whole (no LIMIT) in username order
+        response = self.assertWithinBudget(
+            self.admin_client,
+            reverse("admin:accounts_customuser_changelist") + "?is_student__exact=1&is_authorized__exact=0",
+            allowed_scans=(paginator_count, index_order),
+        )
+        self.assertFalse(response.context["cl"].multi_page)
+
+    def test_user_changelist_prefix_search(self):
+        response = self.assertWithinBudget(
+            self.admin_client,
+            reverse("admin:accounts_customuser_changelist") + "?q=SEED-student-11",
+        )
+        usernames = [user.username for user in response.context["cl"].result_list]
+        self.assertIn("seed-student-11", usernames)
+        self.assertTrue(all(name.startswith("seed-student-11") for name in usernames))
+
+
+class PurgeUnverifiedTests(TestCase):
+    def make_user(self, username, code_expired_ago, **fields):
+        user = CustomUser.objects.create_user(username, f"{username}@example.com", "pw", is_student=True, **fields)
+        CustomUser.objects.filter(pk=user.pk).update(
+            verification_code_hash="x" * 64,
+            verification_code_expires_at=timezone.now() - code_expired_ago,
+        )
+        return user
+
+    def test_deletes_old_abandoned_signups_and_clears_stale_codes(self):
+        abandoned = self.make_user("abandoned", timedelta(days=10))
+        recent = self.make_user("recent", timedelta(days=1))
+        verifying = self.make_user("verifying", -timedelta(minutes=5))
+        verified = self.make_user("verified", timedelta(days=10), is_authorized=True)
+
+        out = StringIO()
+        call_command("purge_unverified", older_than="7d", sleep=0, chunk_size=1, stdout=out)
+
+        self.assertIn("Deleted 1 abandoned signup(s) and cleared 1 expired verification code(s).", out.getvalue())
+        remaining = set(CustomUser.objects.values_list("username", flat=True))
+        self.assertEqual(remaining, {recent.username, verifying.username, verified.username})
+        verified.refresh_from_db()
+        self.assertEqual((verified.verification_code_hash, verified.verification_code_expires_at), ("", None))
+        self.assertFalse(CustomUser.objects.filter(pk=abandoned.pk).exists())
+
+    def test_dry_run_changes_nothing(self):
+        self.make_user("abandoned", timedelta(days=10))
+        out = StringIO()
+        call_command("purge_unverified", dry_run=True, stdout=out)
+        self.assertIn("Would delete 1 abandoned signup(s)", out.getvalue())
+        self.assertEqual(CustomUser.objects.count(), 1)
+
+
+class ImportStudentsTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(title="Roster Course", short_description="", description="")
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def roster(self, *lines):
+        path = Path(self.tmp.name) / "roster.csv"
+        path.write_text("\n".join(["Username,Email,Password,First_Name,Last_Name", *lines]) + "\n", encoding="utf-8")
+        return str(path)
+
+    def run_import(self, path, **options):
+        out, err = StringIO(), StringIO()
+        call_command("import_students", path, workers=2, batch_size=2, stdout=out, stderr=err, **options)
+        return out.getvalue(), err.getvalue()
+
+    def test_imports_enrolls_and_is_idempotent(self):
+        path = self.roster(
+            "ana,Ana@Example.com,secret-one,Ana,Lopez",
+            "ben,ben@example.com,,Ben,Ode",
+            "carla,carla@example.com,secret-three,Carla,Diaz",
+            "bad name!,bad@example.com,x,,",
+        )
+        out, err = self.run_import(path, course=self.course.slug, approve=True)
+        self.assertIn("Created 3 student(s), 0 already existed, 1 row(s) skipped; 3 enrollment(s) created", out)
+        self.assertIn("line 5: skipped", err)
+
+        ana = CustomUser.objects.get(username="ana")
+        self.assertEqual(ana.email, "ana@example.com")
+        self.assertTrue(ana.check_password("secret-one"))
+        self.assertTrue(ana.is_student and ana.is_authorized)
+        # no password given: a random one, resettable by email
+        self.assertTrue(CustomUser.objects.get(username="ben").has_usable_password())
+        self.assertEqual(Enrollment.objects.filter(course=self.course, is_approved=True).count(), 3)
+
+        out, _ = self.run_import(path, course=self.course.slug, approve=True)
+        self.assertIn("Created 0 student(s), 3 already existed, 1 row(s) skipped; 0 enrollment(s) created", out)
+        self.assertEqual(CustomUser.objects.count(), 3)
+
+    def test_skips_taken_emails_and_approves_pending_requests(self):
+        taken = CustomUser.objects.create_user("someone", "dup@example.com", "pw")
+        student = CustomUser.objects.create_user("dora", "dora@example.com", "pw", is_student=True)
+        Enrollment.objects.create(student=student, course=self.course, is_approved=False)
+
+        out, err = self.run_import(
+            self.roster("newbie,DUP@example.com,pw,,", "dora,dora@example.com,,,"),
+            course=self.course.slug,
+            approve=True,
+        )
+        self.assertIn("Created 0 student(s), 1 already existed, 1 row(s) skipped; 0 enrollment(s) created, 1 approved", out)
+        self.assertIn("belongs to another account", err)
+        self.assertFalse(CustomUser.objects.filter(username="newbie").exists())
+        self.assertTrue(Enrollment.objects.get(student=student).is_approved)
+        self.assertEqual(CustomUser.objects.get(pk=taken.pk).username, "someone")
+
+    def test_skips_existing_username_with_another_email(self):
+        student = CustomUser.objects.create_user("eli", "eli@example.com", "pw", is_student=True)
+
+        out, err = self.run_import(self.roster("eli,eli.new@example.com,,,"), course=self.course.slug, approve=True)
+        self.assertIn("Created 0 student(s), 0 already existed, 1 row(s) skipped; 0 enrollment(s) created", out)
+        self.assertIn("line 2: skipped (eli exists with a different email than eli.new@example.com)", err)
+        self.assertFalse(Enrollment.objects.filter(student=student).exists())
+        self.assertEqual(CustomUser.objects.get(pk=student.pk).email, "eli@example.com")
+
+
+@override_settings(CACHED_USER_LOADER=True)
+class CachedUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user("cached", "cached@example.com", "pw", is_student=True)
+        self.client.force_login(self.user)
+        self.session = self.client.session
+        self.session.load()
+
+    def load(self):
+        request = RequestFactory().get("/")
+        request.session = self.session
+        return get_cached_user(request)
+
+    def test_queryset_update_is_seen_immediately(self):
+        self.assertEqual(self.load().pk, self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.load().pk, self.user.pk)
+
+        CustomUser.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsInstance(self.load(), AnonymousUser)
+
+    def test_password_changed_through_update_ends_the_session(self):
+        self.load()
+        CustomUser.objects.filter(pk=self.user.pk).update(password="pbkdf2_sha256$1$x$y")
+        self.assertIsInstance(self.load(), AnonymousUser)
+
+    def test_local_snapshot_is_short_lived(self):
+        self.load()
+        later = time.time() + LOCAL_USER_SNAPSHOT_TIMEOUT + 1
+        with patch("django.core.cache.backends.locmem.time.time", return_value=later), self.assertNumQueries(1):
+            self.load()
+
+    @override_settings(CACHED_USER_LOADER=False)
+    def test_update_without_the_loader_is_one_query(self):
+        with self.assertNumQueries(1):
+            CustomUser.objects.filter(is_student=True).update(first_name="Updated")
+
+
+class WriteAvoidingSessionTests(TestCase):
+    def test_unchanged_scalar_is_not_marked_modified(self):
+        session = WriteAvoidingSessionStore()
+        session["course"] = "english"
+        session.save()
+
+        session = WriteAvoidingSessionStore(session.session_key)
+        session["course"] = "english"
+        self.assertFalse(session.modified)
+        session["course"] = "spanish"
+        self.assertTrue(session.modified)
+
+    def test_mutate_then_reassign_is_saved(self):
+        session = WriteAvoidingSessionStore()
+        session["cart"] = [1]
+        session.save()
+
+        session = WriteAvoidingSessionStore(session.session_key)
+        cart = session["cart"]
+        cart.append(2)
+        session["cart"] = cart
+        self.assertTrue(session.modified)
+        session.save()
+        self.assertEqual(WriteAvoidingSessionStore(session.session_key)["cart"], [1, 2])
@@ -2,8 +2,11 @@ from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.shortcuts import render, redirect
 from django.http import HttpResponseForbidden
+
+from config.query_budget import query_budget
 from .forms import StudentLoginForm
 
+@query_budget(9)
 def student_login(request):
     if request.user.is_authenticated:
         # if already logged in, go to dashboard
@@ -30,12 +33,14 @@ def student_login(request):
 
     return render(request, "accounts/student_login.html", {"form": form, "error": error})
 
+@query_budget(2)
 @login_required
 def student_dashboard(request):
     if not getattr(request.user, "is_student", False):
         return HttpResponseForbidden("Students only.")
     return render(request, "accounts/student_dashboard.html")
 
+@query_budget(4)
 def student_logout(request):
     logout(request)
     return redirect("student_login")
@@ -0,0 +1,19 @@
+"""
+Whether the cache is shared between worker processes.
+
+Redis (REDIS_URL) is; the LocMemCache fallback is private to each process,
+so an invalidation only reaches the worker that made the write. Caches that
+rely on invalidation use long timeouts only when the cache is shared, and a
+few seconds (or the database) otherwise. CACHE_IS_SHARED overrides the
+guess, e.g. for a single-process deployment.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def cache_is_shared(alias="default"):
+    shared = getattr(settings, "CACHE_IS_SHARED", None)
+    if shared is not None:
+        return shared
+    return not isinstance(caches[alias], LocMemCache)
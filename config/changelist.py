@@ -0,0 +1,56 @@
+"""
+Admin changelists that stay usable on big tables: above
+ADMIN_ESTIMATED_COUNT_THRESHOLD rows the paginator takes the row count from
+Postgres' planner statistics instead of running COUNT(*), and the second
+"N total" count is not run at all.
+"""
+import json
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+ESTIMATED_COUNT_THRESHOLD = getattr(settings, "ADMIN_ESTIMATED_COUNT_THRESHOLD", 10000)
+
+
+def estimated_count(queryset):
+    """The planner's row estimate for ``queryset`` (Postgres only), else None."""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            # ✅ whole table: pg_class.reltuples, kept current by (auto)ANALYZE
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+            # -1: never analyzed
+            return row[0] if row and row[0] >= 0 else None
+
+        sql, params = queryset.query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is not None and estimate >= ESTIMATED_COUNT_THRESHOLD:
+            return estimate
+        # small (or not Postgres): an exact count is cheap enough
+        return super().count
+
+
+class EstimatedCountChangelistMixin:
+    """ModelAdmin mixin: estimated counts on big tables, no full-table "N total" count."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
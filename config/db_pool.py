@@ -0,0 +1,38 @@
+"""
+Connection-pool statistics for DB_POOL=true (psycopg 3 pool). Numbers are
+per worker process, since each process owns its own pool.
+"""
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db import connections
+from django.http import JsonResponse
+
+
+def pool_stats():
+    """{alias: {...}} for every pooled database; empty when pooling is off."""
+    stats = {}
+    for alias in connections:
+        wrapper = connections[alias]
+        if not wrapper.settings_dict.get("OPTIONS", {}).get("pool"):
+            continue
+
+        raw = wrapper.pool.get_stats()
+        size = raw.get("pool_size", 0)
+        requests = raw.get("requests_num", 0)
+        stats[alias] = {
+            "min_size": raw.get("pool_min", 0),
+            "max_size": raw.get("pool_max", 0),
+            "size": size,
+            "in_use": size - raw.get("pool_available", size),
+            "waiting": raw.get("requests_waiting", 0),
+            "checkouts": requests,
+            "checkout_wait_ms_avg": raw.get("requests_wait_ms", 0) / requests if requests else 0.0,
+            "checkout_timeouts": raw.get("requests_errors", 0),
+            "connection_errors": raw.get("connections_errors", 0),
+            "connections_lost": raw.get("connections_lost", 0),
+        }
+    return stats
+
+
+@staff_member_required
+def pool_stats_view(request):
+    return JsonResponse(pool_stats())
@@ -0,0 +1,111 @@
+"""
+Primary/replica routing (enabled when REPLICA_DATABASE_URL is set).
+
+Nothing goes to the replica by default. Code opts in for read-mostly paths
+(the course catalog, admin changelists) with ``replica_reads()`` /
+``@use_replica``. A request that has written anything stays on the primary
+for the rest of the request, and for REPLICA_PIN_SECONDS afterwards via a
+cookie, so the client never reads behind its own writes. migrate never
+touches the replica; locally, copy db.sqlite3 to the replica's file.
+"""
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+REPLICA = "replica"
+PIN_COOKIE = "primary_pin"
+
+_replica_reads = ContextVar("replica_reads", default=False)
+# the current request's _RequestPin; None outside PrimaryPinningMiddleware
+_request_pin = ContextVar("request_pin", default=None)
+
+
+class _RequestPin:
+    # ✅ mutable, so a write in a sync_to_async thread (a copied context) still pins the request
+    def __init__(self, pinned):
+        self.pinned = pinned
+        self.wrote = False
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def use_replica(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with replica_reads():
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        pin = _request_pin.get()
+        if (
+            _replica_reads.get()
+            and not (pin is not None and (pin.pinned or pin.wrote))
+            and not connections["default"].in_atomic_block
+        ):
+            return REPLICA
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        # only a request is pinned; commands and threads outside one read as they opted in
+        pin = _request_pin.get()
+        if pin is not None:
+            pin.wrote = True
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # same data on both sides
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # ✅ the replica gets its schema by replication, never from migrate
+        return db != REPLICA
+
+
+class PrimaryPinningMiddleware:
+    """
+    Scopes the primary pin to the request and carries it over to the
+    client's next requests after a write (replication lag window).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        pin = _RequestPin(pinned=PIN_COOKIE in request.COOKIES)
+        token = _request_pin.set(pin)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_pin.reset(token)
+
+        if pin.wrote:
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=getattr(settings, "REPLICA_PIN_SECONDS", 5),
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class ReplicaChangelistMixin:
+    """ModelAdmin mixin: changelist GETs (listing, filters, counts) read from the replica."""
+
+    def changelist_view(self, request, extra_context=None):
+        with replica_reads(enabled=request.method == "GET"):
+            return super().changelist_view(request, extra_context)
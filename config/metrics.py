@@ -0,0 +1,371 @@
+"""
+Per-request instrumentation: query count, DB time, template render time and
+total time per URL name. Staff (or any visitor with DEBUG on) get a
+Server-Timing header, and the numbers are aggregated into Prometheus
+histograms served at /metrics.
+
+Aggregates are kept in process memory and flushed to the cache every
+METRICS_FLUSH_SECONDS by a background thread (one index update plus about
+26 add/incr calls per active view per flush, none on the request path).
+With a shared cache (Redis), /metrics reports every worker's traffic
+whichever worker serves the scrape. Under the LocMemCache fallback each
+worker only has its own counters: /metrics says so (metrics_cache_shared 0)
+and a warning is logged when the flusher starts.
+Template time comes from the TimedDjangoTemplates backend (settings.TEMPLATES).
+"""
+import hmac
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.redis import RedisCache
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse, HttpResponseForbidden
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template as DjangoBackendTemplate, reraise
+from django.utils.functional import SimpleLazyObject, empty
+
+from .cache import cache_is_shared
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+FLUSH_SECONDS = getattr(settings, "METRICS_FLUSH_SECONDS", 10)
+
+KEYS_INDEX = "metrics:keys"
+
+# config.db_pool.pool_stats() fields exported as db_pool_<name>
+POOL_SERIES = (
+    ("size", "gauge", "Open connections in this worker's pool."),
+    ("in_use", "gauge", "Connections checked out of this worker's pool."),
+    ("waiting", "gauge", "Requests waiting for a connection."),
+    ("checkout_wait_ms_avg", "gauge", "Average wait for a connection, in milliseconds."),
+    ("checkout_timeouts", "counter", "Checkouts that timed out."),
+)
+
+# (queries, db seconds, template seconds) for the request being served
+_current = ContextVar("request_metrics", default=None)
+
+
+class _RequestTimings:
+    __slots__ = ("queries", "db", "templates")
+
+    def __init__(self):
+        self.queries = 0
+        self.db = 0.0
+        self.templates = 0.0
+
+
+# ----------------------------
+# Probes
+# ----------------------------
+def _db_probe(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db += time.perf_counter() - started
+
+
+def _install_db_probe(sender, connection, **kwargs):
+    if _db_probe not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_db_probe)
+
+
+class TimedTemplate(DjangoBackendTemplate):
+    def render(self, context=None, request=None):
+        timings = _current.get()
+        if timings is None:
+            return super().render(context, request)
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            timings.templates += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, with render time added to the request's timings."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(self.engine.get_template(template_name), self)
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
+
+
+_probes_installed = False
+
+
+def install_probes():
+    global _probes_installed
+    if _probes_installed:
+        return
+    connection_created.connect(_install_db_probe, dispatch_uid="config.metrics.db_probe")
+    # connections opened before the middleware loaded (e.g. by warm-up)
+    for connection in connections.all(initialized_only=True):
+        if connection.connection is not None:
+            _install_db_probe(None, connection)
+    _probes_installed = True
+
+
+# ----------------------------
+# Aggregation
+# ----------------------------
+def _redis_client():
+    backend = caches["default"]
+    if isinstance(backend, RedisCache):
+        return backend._cache.get_client(write=True)
+    return None
+
+
+class Registry:
+    """Integer counters keyed by (metric, view, le); flushed to the cache as deltas."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.flush_lock = threading.Lock()
+        self.pending = defaultdict(int)
+        self.flusher_pid = None
+
+    def observe(self, view, total, queries, db, templates):
+        self.ensure_flusher()
+        with self.lock:
+            p = self.pending
+            for le in DURATION_BUCKETS:
+                if total <= le:
+                    p[("duration_bucket", view, str(le))] += 1
+            for le in QUERY_BUCKETS:
+                if queries <= le:
+                    p[("queries_bucket", view, str(le))] += 1
+            p[("count", view, "")] += 1
+            # sums in microseconds, so the cache can INCR them
+            p[("duration_sum_us", view, "")] += int(total * 1e6)
+            p[("db_sum_us", view, "")] += int(db * 1e6)
+            p[("template_sum_us", view, "")] += int(templates * 1e6)
+            p[("queries_sum", view, "")] += queries
+
+    def ensure_flusher(self):
+        # ✅ per process: a thread started before a fork (preload) doesn't survive it
+        pid = os.getpid()
+        if self.flusher_pid == pid:
+            return
+        with self.lock:
+            if self.flusher_pid == pid:
+                return
+            self.flusher_pid = pid
+        threading.Thread(target=self._flush_forever, name="metrics-flush", daemon=True).start()
+        if not cache_is_shared():
+            logger.warning("metrics: the cache is per process, /metrics only reports the worker that serves it")
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(FLUSH_SECONDS)
+            try:
+                self.flush()
+            except Exception:
+                # the cache being down must not kill the thread
+                logger.exception("metrics flush failed")
+
+    def flush(self):
+        with self.flush_lock:
+            with self.lock:
+                pending, self.pending = self.pending, defaultdict(int)
+            if not pending:
+                return
+
+            keys = {"metrics:" + "|".join(k): v for k, v in pending.items()}
+            # every flush, not once: the index may have been evicted since
+            self._index_add(set(keys))
+            for key, delta in keys.items():
+                if not cache.add(key, delta, None):
+                    try:
+                        cache.incr(key, delta)
+                    except ValueError:
+                        cache.set(key, delta, None)
+
+    def _index_add(self, keys):
+        client = _redis_client()
+        if client is not None:
+            # ✅ SADD: concurrent flushes from other workers can't drop each other's keys
+            client.sadd(cache.make_key(KEYS_INDEX), *keys)
+            return
+        # local-memory cache: private to this process, and flushes hold flush_lock
+        known = cache.get(KEYS_INDEX) or set()
+        if not known.issuperset(keys):
+            cache.set(KEYS_INDEX, known | keys, None)
+
+    def _index_members(self):
+        client = _redis_client()
+        if client is not None:
+            return {member.decode() for member in client.smembers(cache.make_key(KEYS_INDEX))}
+        return cache.get(KEYS_INDEX) or set()
+
+    def snapshot(self):
+        """{(metric, view, le): value} across all workers (after flushing our own)."""
+        self.flush()
+        values = cache.get_many(self._index_members())
+        return {tuple(key[len("metrics:"):].split("|")): value for key, value in values.items()}
+
+
+registry = Registry()
+
+
+# ----------------------------
+# Middleware
+# ----------------------------
+def _may_see_timings(request):
+    """DEBUG, or a staff user the view has already loaded (no extra queries for the header)."""
+    if settings.DEBUG:
+        return True
+    user = getattr(request, "user", None)
+    if user is None or (isinstance(user, SimpleLazyObject) and user._wrapped is empty):
+        return False
+    return user.is_staff
+
+
+class RequestMetricsMiddleware:
+    # ✅ async-capable so ASGI requests don't hop to a thread just for this
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        install_probes()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings = _RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        timings = _RequestTimings()
+        token = _current.set(timings)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, timings, time.perf_counter() - started)
+
+    def finish(self, request, response, timings, total):
+        if _may_see_timings(request):
+            response["Server-Timing"] = (
+                f'db;dur={timings.db * 1000:.1f};desc="{timings.queries} queries", '
+                f"tpl;dur={timings.templates * 1000:.1f}, "
+                f"total;dur={total * 1000:.1f}"
+            )
+
+        match = getattr(request, "resolver_match", None)
+        view = (match.url_name or match.view_name) if match else "unresolved"
+        registry.observe(view, total, timings.queries, timings.db, timings.templates)
+        return response
+
+
+# ----------------------------
+# /metrics
+# ----------------------------
+def _render(snapshot):
+    by_metric = defaultdict(dict)
+    for (metric, view, le), value in snapshot.items():
+        by_metric[metric][(view, le)] = value
+    views = sorted({view for (_, view, _) in snapshot})
+
+    lines = []
+
+    def histogram(name, help_text, bucket_metric, buckets, sum_metric, scale):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for view in views:
+            count = by_metric["count"].get((view, ""), 0)
+            for le in buckets:
+                value = by_metric[bucket_metric].get((view, str(le)), 0)
+                lines.append(f'{name}_bucket{{view="{view}",le="{le}"}} {value}')
+            lines.append(f'{name}_bucket{{view="{view}",le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{view="{view}"}} {by_metric[sum_metric].get((view, ""), 0) * scale:g}')
+            lines.append(f'{name}_count{{view="{view}"}} {count}')
+
+    def counter(name, help_text, metric, scale):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for view in views:
+            lines.append(f'{name}{{view="{view}"}} {by_metric[metric].get((view, ""), 0) * scale:g}')
+
+    histogram(
+        "http_request_duration_seconds", "Total time per request.",
+        "duration_bucket", DURATION_BUCKETS, "duration_sum_us", 1e-6,
+    )
+    histogram(
+        "http_request_db_queries", "SQL queries per request.",
+        "queries_bucket", QUERY_BUCKETS, "queries_sum", 1,
+    )
+    counter("http_request_db_seconds_total", "Time spent in SQL.", "db_sum_us", 1e-6)
+    counter("http_request_template_seconds_total", "Time spent rendering templates.", "template_sum_us", 1e-6)
+    return lines
+
+
+def _extra_lines():
+    from config.db_pool import pool_stats
+    from user.throttling import throttle_counters
+
+    shared = int(cache_is_shared())
+    lines = [
+        "# HELP metrics_cache_shared 1 when these series cover every worker, 0 when only this one.",
+        "# TYPE metrics_cache_shared gauge",
+        f"metrics_cache_shared {shared}",
+        "# HELP throttle_requests_total Throttled endpoint requests by outcome.",
+        "# TYPE throttle_requests_total counter",
+    ]
+    for endpoint, counts in throttle_counters().items():
+        for outcome, value in counts.items():
+            lines.append(f'throttle_requests_total{{endpoint="{endpoint}",outcome="{outcome}"}} {value}')
+
+    # pool stats are per process, whatever the cache
+    stats_by_alias = pool_stats()
+    if stats_by_alias:
+        for stat, kind, help_text in POOL_SERIES:
+            lines.append(f"# HELP db_pool_{stat} {help_text}")
+            lines.append(f"# TYPE db_pool_{stat} {kind}")
+            for alias, stats in stats_by_alias.items():
+                lines.append(f'db_pool_{stat}{{alias="{alias}"}} {stats[stat]:g}')
+    return lines
+
+
+def _authorized(request):
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+        if hmac.compare_digest(supplied, token):
+            return True
+    return request.user.is_authenticated and request.user.is_staff
+
+
+def metrics_view(request):
+    if not _authorized(request):
+        return HttpResponseForbidden("Forbidden.")
+    lines = _render(registry.snapshot()) + _extra_lines()
+    return HttpResponse("\n".join(lines) + "\n", content_type="text/plain; version=0.0.4")
@@ -0,0 +1,171 @@
+"""
+Query budgets: the most SQL queries a view (or admin changelist) may run,
+however much data there is. Declared next to the code with
+``@query_budget(n)`` on views and ``changelist_query_budget = n`` on
+ModelAdmins; enforced by the test suite with ``assert_query_budget``, which
+also captures the plan of any query that sequentially scans one of the big
+tables (SEQ_SCAN_TABLES) once it holds QUERY_BUDGET_SEQ_SCAN_MIN_ROWS rows.
+A scan fails the test unless one of the ``allowed_scans`` predicates
+(``CHANGELIST_SCANS`` for the admin) says it is expected.
+"""
+import logging
+import re
+from contextlib import contextmanager
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connections
+from django.core.cache import cache
+from django.urls import resolve
+
+logger = logging.getLogger(__name__)
+
+SEQ_SCAN_TABLES = ("courses_enrollment", "accounts_customuser")
+SEQ_SCAN_MIN_ROWS = getattr(settings, "QUERY_BUDGET_SEQ_SCAN_MIN_ROWS", 1000)
+
+# "Seq Scan on courses_enrollment" (Postgres) / "SCAN courses_enrollment" (SQLite)
+_SEQ_SCAN_RE = {
+    "postgresql": re.compile(r"Seq Scan on (\w+)"),
+    "sqlite": re.compile(r"^SCAN (\w+)"),
+}
+# the plan sorts the rows itself rather than reading them in index order
+_SORT_RE = re.compile(r"TEMP B-TREE FOR ORDER BY|\bSort\b")
+_LIMIT_RE = re.compile(r"\bLIMIT \d+\s*$", re.IGNORECASE)
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def query_budget(max_queries):
+    """Declare the most queries a view may run (read by the tests via ``budget_for``)."""
+
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+
+    return decorator
+
+
+def budget_for(view):
+    """The declared budget of a resolved view function, or None."""
+    model_admin = getattr(view, "model_admin", None)
+    if model_admin is not None:
+        if view.__name__ == "changelist_view":
+            return getattr(model_admin, "changelist_query_budget", None)
+        return None
+    return getattr(view, "query_budget", None)
+
+
+def explain(sql, using="default"):
+    connection = connections[using]
+    prefix = "EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN "
+    with connection.cursor() as cursor:
+        cursor.execute(prefix + sql)
+        rows = cursor.fetchall()
+    # SQLite: (id, parent, notused, detail); Postgres: one text column
+    return [row[-1] for row in rows]
+
+
+def _table_rows():
+    counts = {}
+    for model in apps.get_models():
+        if model._meta.db_table in SEQ_SCAN_TABLES:
+            counts[model._meta.db_table] = model._base_manager.count()
+    return counts
+
+
+def seq_scans(queries, using="default", min_rows=SEQ_SCAN_MIN_ROWS):
+    """[(sql, plan lines)] for captured SELECTs that sequentially scan a big SEQ_SCAN_TABLES table."""
+    pattern = _SEQ_SCAN_RE.get(connections[using].vendor)
+    if pattern is None:
+        return []
+
+    big = {table for table, rows in _table_rows().items() if rows >= min_rows}
+    found = []
+    for query in queries:
+        sql = query["sql"]
+        if not big or not sql.lstrip().upper().startswith("SELECT"):
+            continue
+        plan = explain(sql, using)
+        if any((m := pattern.search(line.strip())) and m.group(1) in big for line in plan):
+            found.append((sql, plan))
+    return found
+
+
+def paginator_count(sql, plan):
+    """
+    The changelist paginator's exact COUNT(*): always on SQLite, and on
+    Postgres below ADMIN_ESTIMATED_COUNT_THRESHOLD (config.changelist takes
+    the planner's estimate above it).
+    """
+    return sql.lstrip().upper().startswith("SELECT COUNT(*)")
+
+
+def index_order(sql, plan):
+    """Rows read in index order, with no sort: a single-page changelist reads every match this way."""
+    return not any(_SORT_RE.search(line) for line in plan)
+
+
+def ordered_page(sql, plan):
+    """A LIMITed page read in index order: the scan stops after one page."""
+    return bool(_LIMIT_RE.search(sql)) and index_order(sql, plan)
+
+
+# the scans an admin changelist of a big table is expected to make
+CHANGELIST_SCANS = (paginator_count, ordered_page)
+
+
+def _describe(queries):
+    return "\n".join(f"  {n}. {q['sql']}" for n, q in enumerate(queries, 1))
+
+
+@contextmanager
+def assert_query_budget(budget, label="", using="default", allowed_scans=()):
+    """
+    Raise QueryBudgetExceeded if the block runs more than ``budget`` queries,
+    or sequentially scans a big table in a way none of the ``allowed_scans``
+    predicates (``(sql, plan) -> bool``) accepts. The captured queries and
+    any scan plans are left on the yielded context as ``captured_queries``
+    and ``scans``.
+    """
+    # test-only machinery: kept out of the views' import path
+    from django.test.utils import CaptureQueriesContext
+
+    with CaptureQueriesContext(connections[using]) as captured:
+        yield captured
+
+    captured.scans = seq_scans(captured.captured_queries, using)
+
+    if len(captured) > budget:
+        raise QueryBudgetExceeded(
+            f"{label or 'block'} ran {len(captured)} queries, budget is {budget}:\n"
+            f"{_describe(captured.captured_queries)}"
+        )
+    unexpected = []
+    for sql, plan in captured.scans:
+        if any(allowed(sql, plan) for allowed in allowed_scans):
+            logger.debug("%s: expected scan:\n  %s\n    %s", label or "block", sql, "\n    ".join(plan))
+        else:
+            unexpected.append((sql, plan))
+    if unexpected:
+        plans = "\n".join(f"  {sql}\n    " + "\n    ".join(plan) for sql, plan in unexpected)
+        raise QueryBudgetExceeded(f"{label or 'block'} sequentially scans a large table:\n{plans}")
+
+
+class QueryBudgetMixin:
+    """TestCase mixin: request a URL with a cold cache and hold it to its view's budget."""
+
+    def assertWithinBudget(self, client, url, method="get", data=None, allowed_scans=(), **extra):
+        view = resolve(url.split("?")[0]).func
+        budget = budget_for(view)
+        self.assertIsNotNone(budget, f"{view.__module__}.{view.__name__} declares no query budget")
+
+        # ✅ cold cache: the budget covers the worst case, not a warm hit
+        cache.clear()
+        # https, so SECURE_SSL_REDIRECT doesn't answer for the view
+        extra.setdefault("secure", True)
+        with assert_query_budget(budget, f"{method.upper()} {url}", allowed_scans=allowed_scans):
+            response = getattr(client, method)(url, data, **extra)
+        self.assertLess(response.status_code, 400, f"{method.upper()} {url}")
+        return response
@@ -44,6 +44,7 @@ INSTALLED_APPS = [
 # Middleware
 # ----------------------------
 MIDDLEWARE = [
+    "config.metrics.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -54,6 +55,22 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Opt-in: serve request.user from a cached snapshot (accounts.middleware)
+CACHED_USER_LOADER = os.getenv("CACHED_USER_LOADER", "False").lower() == "true"
+
+if CACHED_USER_LOADER:
+    MIDDLEWARE[MIDDLEWARE.index("django.contrib.auth.middleware.AuthenticationMiddleware")] = (
+        "accounts.middleware.CachedAuthenticationMiddleware"
+    )
+
+# Per-request timings (Server-Timing header + /metrics, see config.metrics)
+REQUEST_METRICS = os.getenv("REQUEST_METRICS", "True").lower() == "true"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_FLUSH_SECONDS = int(os.getenv("METRICS_FLUSH_SECONDS", "10"))
+
+if not REQUEST_METRICS:
+    MIDDLEWARE.remove("config.metrics.RequestMetricsMiddleware")
+
 ROOT_URLCONF = "config.urls"
 
 # ----------------------------
@@ -61,7 +78,8 @@ ROOT_URLCONF = "config.urls"
 # ----------------------------
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        # DjangoTemplates + render timings for config.metrics
+        "BACKEND": "config.metrics.TimedDjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -86,19 +104,59 @@ LOGIN_URL = "student_login"
 LOGIN_REDIRECT_URL = "student_dashboard"
 LOGOUT_REDIRECT_URL = "student_login"
 
+# Async login/signup/verify views (user.async_views) for ASGI deployments
+ASYNC_AUTH_VIEWS = os.getenv("ASYNC_AUTH_VIEWS", "False").lower() == "true"
+PASSWORD_HASH_THREADS = int(os.getenv("PASSWORD_HASH_THREADS", 4))
+
+# Fixed-window rate limits (user.throttling): endpoint -> (requests, per seconds)
+THROTTLE_RATES = {
+    # per (client IP, username) and per session
+    "student_login": (10, 60),
+    # whole-IP ceiling for logins: a school signs in from behind one NAT
+    "student_login_ip": (300, 60),
+    "student_verify": (10, 60),
+    "resend_code": (3, 300),
+}
+
 # ----------------------------
 # Database (Postgres on Render, SQLite locally)
 # ----------------------------
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# DB_POOL=true: psycopg 3 connection pool per worker process (min/max size,
+# checkout timeout, health check on checkout) instead of one persistent
+# connection per thread. Stats: config.db_pool.pool_stats().
+DB_POOL = os.getenv("DB_POOL", "False").lower() == "true"
+
+DB_POOL_OPTIONS = {
+    "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+    "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+    # seconds a request waits for a free connection before erroring
+    "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+    "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", 300)),
+    "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", 1800)),
+}
+
+
+def postgres_database(url):
+    config = dj_database_url.parse(
+        url,
+        # pooled connections are returned to the pool, not kept per thread
+        conn_max_age=0 if DB_POOL else 600,
+        # pooled only: ConnectionPool.check_connection on every checkout (a
+        # persistent connection would pay a SELECT 1 per request instead)
+        conn_health_checks=DB_POOL,
+        ssl_require=True,
+    )
+    if DB_POOL:
+        config.setdefault("OPTIONS", {})["pool"] = dict(DB_POOL_OPTIONS)
+    return config
+
+
 if DATABASE_URL:
     # Render / production (Postgres)
     DATABASES = {
-        "default": dj_database_url.config(
-            default=DATABASE_URL,
-            conn_max_age=600,
-            ssl_require=True,
-        )
+        "default": postgres_database(DATABASE_URL),
     }
 else:
     # Local dev (SQLite)
@@ -109,8 +167,70 @@ else:
         }
     }
 
+# Read replica (config.db_router): catalog and admin changelist reads only.
+# Locally, e.g. REPLICA_DATABASE_URL=sqlite:///replica.sqlite3
+REPLICA_DATABASE_URL = os.getenv("REPLICA_DATABASE_URL")
+REPLICA_PIN_SECONDS = int(os.getenv("REPLICA_PIN_SECONDS", 5))
+
+if REPLICA_DATABASE_URL:
+    if REPLICA_DATABASE_URL.startswith("sqlite"):
+        DATABASES["replica"] = dj_database_url.parse(REPLICA_DATABASE_URL)
+    else:
+        DATABASES["replica"] = postgres_database(REPLICA_DATABASE_URL)
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+    DATABASE_ROUTERS = ["config.db_router.PrimaryReplicaRouter"]
+    MIDDLEWARE.insert(
+        MIDDLEWARE.index("django.contrib.messages.middleware.MessageMiddleware"),
+        "config.db_router.PrimaryPinningMiddleware",
+    )
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# ----------------------------
+# Cache (Redis when available, per-process memory locally)
+# ----------------------------
+REDIS_URL = os.getenv("REDIS_URL")
+
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            # ✅ enrollment state, throttle buckets, metrics counters and the catalog
+            # version share this cache: the default 300 entries would cull them.
+            # It is private to each worker, so invalidated entries only live
+            # seconds here (config.cache.cache_is_shared)
+            "OPTIONS": {"MAX_ENTRIES": int(os.getenv("LOCMEM_CACHE_MAX_ENTRIES", 50000))},
+        }
+    }
+
+# unset: guessed from the backend (config.cache); "true" e.g. for a single process
+CACHE_IS_SHARED = {"true": True, "false": False}.get(os.getenv("CACHE_IS_SHARED", "").lower())
+
+# ----------------------------
+# Sessions (accounts.session_engines skip saving unchanged sessions)
+# ----------------------------
+# db: every write hits Postgres; cached_db: reads from cache, writes through;
+# cache: no session table at all (sessions lost if the cache is flushed)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "cached_db" if REDIS_URL else "db")
+SESSION_ENGINE = f"accounts.session_engines.{SESSION_BACKEND}"
+
+# Anonymous full-page cache (user.page_cache); a new deploy starts a fresh cache
+PAGE_CACHE_TIMEOUT = int(os.getenv("PAGE_CACHE_TIMEOUT", 5 * 60))
+PAGE_CACHE_VERSION = os.getenv("RENDER_GIT_COMMIT", "")
+
+ENROLLMENT_STATE_CACHE_TIMEOUT = int(os.getenv("ENROLLMENT_STATE_CACHE_TIMEOUT", 60 * 60))
+LOCAL_ENROLLMENT_STATE_CACHE_TIMEOUT = int(os.getenv("LOCAL_ENROLLMENT_STATE_CACHE_TIMEOUT", 5))
+LOCAL_CATALOG_CACHE_TIMEOUT = int(os.getenv("LOCAL_CATALOG_CACHE_TIMEOUT", 30))
+LOCAL_USER_SNAPSHOT_CACHE_TIMEOUT = int(os.getenv("LOCAL_USER_SNAPSHOT_CACHE_TIMEOUT", 5))
+
 # ----------------------------
 # Static / Media
 # ----------------------------
@@ -123,16 +243,36 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 STORAGES = {
     "staticfiles": {
-        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+        # ✅ WhiteNoise + resized/WebP variants of every image (config.storage)
+        "BACKEND": "config.storage.ResponsiveImagesStorage",
     }
 }
 
+# Widths (px) generated for each image by collectstatic; only those below the original
+RESPONSIVE_IMAGE_WIDTHS = (80, 240, 480, 960, 1440)
+
 # ----------------------------
 # Email (SendGrid Web API)
 # ----------------------------
 SENDGRID_API_KEY = os.getenv("SENDGRID_API_KEY", "")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "")
 
+# Verification emails go through the outbox (user.outbox, `manage.py run_outbox`)
+EMAIL_OUTBOX_TRANSPORT = os.getenv(
+    "EMAIL_OUTBOX_TRANSPORT",
+    "user.outbox.SendGridTransport" if SENDGRID_API_KEY else "user.outbox.ConsoleTransport",
+)
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", 6))
+# sent/failed outbox rows (bodies already blanked) are deleted after this many days
+EMAIL_OUTBOX_RETENTION_DAYS = int(os.getenv("EMAIL_OUTBOX_RETENTION_DAYS", 7))
+
+# Enrollment status events (courses.events): in-process fan-out, or
+# LISTEN/NOTIFY so every worker process sees every change
+ENROLLMENT_EVENTS_BROKER = os.getenv(
+    "ENROLLMENT_EVENTS_BROKER",
+    "courses.events.PostgresBroker" if DATABASE_URL else "courses.events.LocalBroker",
+)
+
 # ----------------------------
 # Security (production)
 # ----------------------------
@@ -141,3 +281,5 @@ if not DEBUG:
     SECURE_SSL_REDIRECT = True
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
+    # behind Render's proxy: REMOTE_ADDR is the proxy, the client is in X-Forwarded-For
+    THROTTLE_USE_X_FORWARDED_FOR = True
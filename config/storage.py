@@ -0,0 +1,94 @@
+"""
+Static files storage that, on collectstatic, adds resized width variants and
+WebP versions of every PNG/JPEG before WhiteNoise hashes and compresses
+everything. Variant names look like ``images/login-bg.w960.webp``; their
+sizes are recorded in ``responsive-images.json`` for the
+``responsive_images`` template tags.
+"""
+import io
+import json
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+RESPONSIVE_IMAGE_WIDTHS = getattr(settings, "RESPONSIVE_IMAGE_WIDTHS", (80, 240, 480, 960, 1440))
+RESPONSIVE_IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+RESPONSIVE_IMAGES_MANIFEST = "responsive-images.json"
+WEBP_QUALITY = 80
+
+
+def variant_name(name, width=None, fmt=None):
+    path = PurePosixPath(name)
+    suffix = f".{fmt}" if fmt else path.suffix
+    stem = f"{path.stem}.w{width}" if width else path.stem
+    return str(path.with_name(stem + suffix))
+
+
+def _encode(image, fmt):
+    buf = io.BytesIO()
+    if fmt == "webp":
+        image.save(buf, "WEBP", quality=WEBP_QUALITY, method=4)
+    elif fmt == "png":
+        image.save(buf, "PNG", optimize=True)
+    else:
+        image.convert("RGB").save(buf, "JPEG", quality=85, optimize=True, progressive=True)
+    return buf.getvalue()
+
+
+class ResponsiveImagesStorage(CompressedManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+            paths.update(self.generate_variants(paths))
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def _replace(self, name, content):
+        if self.exists(name):
+            self.delete(name)
+        self._save(name, ContentFile(content))
+
+    def generate_variants(self, paths):
+        """Write the variants + metadata; returns {name: (storage, name)} to add to ``paths``."""
+        from PIL import Image
+
+        generated = {}
+        metadata = {}
+
+        for name, (storage, path) in sorted(paths.items()):
+            if not name.lower().endswith(RESPONSIVE_IMAGE_EXTENSIONS):
+                continue
+
+            with storage.open(path) as f:
+                image = Image.open(f)
+                image.load()
+
+            fmt = "png" if name.lower().endswith(".png") else "jpeg"
+            width, height = image.size
+            entry = {"width": width, "height": height, "variants": []}
+
+            # full-size WebP, then every smaller width in both formats
+            widths = [w for w in RESPONSIVE_IMAGE_WIDTHS if w < width]
+            for w in widths + [None]:
+                resized = image
+                if w:
+                    resized = image.resize((w, round(height * w / width)), Image.LANCZOS)
+
+                variant = {"width": w or width, "webp": variant_name(name, w, "webp")}
+                self._replace(variant["webp"], _encode(resized, "webp"))
+                generated[variant["webp"]] = (self, variant["webp"])
+
+                if w:
+                    variant["original"] = variant_name(name, w)
+                    self._replace(variant["original"], _encode(resized, fmt))
+                    generated[variant["original"]] = (self, variant["original"])
+                else:
+                    variant["original"] = name
+
+                entry["variants"].append(variant)
+
+            metadata[name] = entry
+
+        self._replace(RESPONSIVE_IMAGES_MANIFEST, json.dumps(metadata, indent=2).encode())
+        return generated
@@ -0,0 +1,43 @@
+"""
+Fixtures shared by the apps' test modules: storage settings that don't need
+a collectstatic manifest, and a seeded dataset for the query budget tests.
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+
+from .query_budget import QueryBudgetMixin
+
+# no collectstatic manifest in tests
+TEST_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class SeededTestCase(QueryBudgetMixin, TestCase):
+    """Enough students/enrollments that a sequential scan shows up in the plans."""
+
+    @classmethod
+    def setUpTestData(cls):
+        from courses.models import Enrollment
+
+        call_command("seed_scale", students=1200, courses=30, stdout=StringIO())
+        enrollment = (
+            Enrollment.objects.filter(is_approved=True, course__is_published=True)
+            .select_related("student")
+            .order_by("pk")
+            .first()
+        )
+        cls.student = enrollment.student
+        cls.course = enrollment.course
+        cls.admin = get_user_model().objects.create_superuser("budget-admin", "budget-admin@example.com", "pw")
+
+    def setUp(self):
+        self.student_client = Client()
+        self.student_client.force_login(self.student)
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
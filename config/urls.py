@@ -2,8 +2,13 @@ from django.contrib import admin
 from django.urls import path, include
 from django.contrib.auth import views as auth_views
 
+from .db_pool import pool_stats_view
+from .metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("internal/db-pool/", pool_stats_view, name="db_pool_stats"),
+    path("metrics", metrics_view, name="metrics"),
     path("", include("user.urls")),
     path("", include("courses.urls")),
 
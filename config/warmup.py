@@ -0,0 +1,70 @@
+"""
+Warm a freshly started worker so the first real request doesn't pay for it:
+compile every template into the cached loader, populate the URL resolver,
+and open + ping each database connection (SSL handshake included).
+
+Run from gunicorn.conf.py (post_worker_init) or `manage.py warmup`.
+"""
+import logging
+import time
+from pathlib import Path
+
+from django.db import connections
+from django.template import TemplateSyntaxError, engines
+from django.urls import NoReverseMatch, get_resolver, reverse
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_SUFFIXES = (".html", ".txt")
+
+
+def warm_templates():
+    compiled = 0
+    for engine in engines.all():
+        for template_dir in getattr(engine, "template_dirs", ()):
+            root = Path(template_dir)
+            for path in root.rglob("*"):
+                if path.suffix not in TEMPLATE_SUFFIXES:
+                    continue
+                try:
+                    engine.get_template(path.relative_to(root).as_posix())
+                    compiled += 1
+                except TemplateSyntaxError as e:
+                    logger.warning("warmup: template %s failed to compile: %s", path, e)
+    return compiled
+
+
+def warm_urls():
+    resolver = get_resolver()
+    names = [name for name in resolver.reverse_dict if isinstance(name, str)]
+    resolved = 0
+    for name in names:
+        try:
+            reverse(name)
+            resolved += 1
+        except NoReverseMatch:
+            # needs arguments; populating the resolver above is the expensive part
+            pass
+    return resolved
+
+
+def warm_databases():
+    for alias in connections:
+        with connections[alias].cursor() as cursor:
+            cursor.execute("SELECT 1")
+    return len(connections.all())
+
+
+def warm_up():
+    """Run every warm-up step; returns {step: (count, seconds)}."""
+    report = {}
+    for step, func in (("templates", warm_templates), ("urls", warm_urls), ("databases", warm_databases)):
+        started = time.perf_counter()
+        try:
+            count = func()
+        except Exception:
+            # a warm-up failure must never stop a worker from booting
+            logger.exception("warmup: %s step failed", step)
+            count = 0
+        report[step] = (count, time.perf_counter() - started)
+    return report
@@ -1,18 +1,76 @@
-from django.contrib import admin
-from .models import Course
-from .models import Course, Enrollment
+from django.contrib import admin, messages
+from django.contrib.auth import get_user_model
+from django.db.models import Q
+
+from config.changelist import EstimatedCountChangelistMixin
+from config.csv_export import csv_chunks, streaming_csv_response
+from config.db_router import ReplicaChangelistMixin
+from .export import ENROLLMENT_COLUMNS
+from .models import Course, CourseSection, Enrollment
+from .search import filter_matching
+
+
+class CourseSectionInline(admin.StackedInline):
+    model = CourseSection
+    fields = ("title", "position", "body")
+    extra = 0
+
 
 @admin.register(Course)
-class CourseAdmin(admin.ModelAdmin):
+class CourseAdmin(ReplicaChangelistMixin, EstimatedCountChangelistMixin, admin.ModelAdmin):
     list_display = ("title", "slug")
     prepopulated_fields = {"slug": ("title",)}
     search_fields = ("title", "slug")
+    inlines = (CourseSectionInline,)
+    changelist_query_budget = 4
+
+    def get_readonly_fields(self, request, obj=None):
+        # ✅ once a course has sections they are what students read; an editable
+        # description would silently drift from them
+        if obj is not None and obj.sections.exists():
+            return (*super().get_readonly_fields(request, obj), "description")
+        return super().get_readonly_fields(request, obj)
+
+    def get_search_results(self, request, queryset, search_term):
+        # ✅ full-text index instead of icontains scans (search_fields is the fallback)
+        matched = filter_matching(queryset, search_term)
+        if matched is None:
+            return super().get_search_results(request, queryset, search_term)
+        return matched, False
 
 
 @admin.register(Enrollment)
-class EnrollmentAdmin(admin.ModelAdmin):
+class EnrollmentAdmin(ReplicaChangelistMixin, EstimatedCountChangelistMixin, admin.ModelAdmin):
     list_display = ("student", "course", "is_approved", "requested_at", "approved_at")
-    list_filter = ("is_approved", "course")
-    search_fields = ("student__username", "student__email", "course__title")
+    list_select_related = ("student", "course")
+    list_filter = ("is_approved", "course", "requested_at")
+    search_fields = ("^student__username", "^student__email", "course__title")
     autocomplete_fields = ("student", "course")
-    list_editable = ("is_approved",)
\ No newline at end of file
+    list_editable = ("is_approved",)
+    actions = ("approve_selected", "export_csv")
+    changelist_query_budget = 7
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+
+        # ✅ match the term on the indexed sides (username/email prefix, course
+        # full-text) in subqueries, then filter enrollments by id: no LIKE over
+        # joins, and no cap that would quietly drop matches
+        students = get_user_model().objects.filter(Q(username__istartswith=term) | Q(email__istartswith=term))
+        courses = filter_matching(Course.objects.all(), term)
+        if courses is None:
+            courses = Course.objects.filter(title__istartswith=term)
+
+        return queryset.filter(Q(student_id__in=students.values("id")) | Q(course_id__in=courses.values("id"))), False
+
+    @admin.action(description="Approve selected enrollments")
+    def approve_selected(self, request, queryset):
+        approved = queryset.approve()
+        self.message_user(request, f"Approved {approved} enrollment(s).", messages.SUCCESS)
+
+    @admin.action(description="Export selected enrollments to CSV")
+    def export_csv(self, request, queryset):
+        # ✅ streamed from values_list: "select all" over the whole table is fine
+        return streaming_csv_response(request, csv_chunks(queryset, ENROLLMENT_COLUMNS), "enrollments.csv")
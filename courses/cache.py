@@ -0,0 +1,238 @@
+import base64
+import time
+from datetime import datetime
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from config.cache import cache_is_shared
+from config.db_router import replica_reads
+
+
+ENROLLMENT_STATE_TIMEOUT = getattr(settings, "ENROLLMENT_STATE_CACHE_TIMEOUT", 60 * 60)
+# per-process cache: other workers never see our invalidations
+LOCAL_ENROLLMENT_STATE_TIMEOUT = getattr(settings, "LOCAL_ENROLLMENT_STATE_CACHE_TIMEOUT", 5)
+CATALOG_TIMEOUT = getattr(settings, "CATALOG_CACHE_TIMEOUT", 24 * 60 * 60)
+LOCAL_CATALOG_TIMEOUT = getattr(settings, "LOCAL_CATALOG_CACHE_TIMEOUT", 30)
+CATALOG_PAGE_SIZE = getattr(settings, "CATALOG_PAGE_SIZE", 20)
+OUTLINE_TIMEOUT = getattr(settings, "COURSE_OUTLINE_CACHE_TIMEOUT", 24 * 60 * 60)
+
+CATALOG_VERSION_KEY = "courses:catalog_version"
+CATALOG_FIELDS = ("id", "title", "slug", "short_description", "created_at")
+
+
+class EnrollmentState(NamedTuple):
+    # course ids, most recently approved first
+    approved: tuple
+    pending: frozenset
+
+    def is_approved(self, course_id):
+        return course_id in self.approved
+
+    def has_requested(self, course_id):
+        return course_id in self.pending or course_id in self.approved
+
+
+def _enrollment_state_key(student_id):
+    return f"courses:enrollment_state:{student_id}"
+
+
+def get_enrollment_state(student):
+    """
+    Approved / pending course ids for a student, cached until one of
+    their enrollments changes (see courses.signals). Without a shared cache
+    only for LOCAL_ENROLLMENT_STATE_TIMEOUT seconds.
+    """
+    from .models import Enrollment
+
+    student_id = getattr(student, "pk", student)
+    key = _enrollment_state_key(student_id)
+
+    state = cache.get(key)
+    if state is not None:
+        return state
+
+    rows = (
+        Enrollment.objects.filter(student_id=student_id)
+        .order_by("-approved_at", "-requested_at")
+        .values_list("course_id", "is_approved")
+    )
+    approved, pending = [], set()
+    for course_id, is_approved in rows:
+        if is_approved:
+            approved.append(course_id)
+        else:
+            pending.add(course_id)
+
+    state = EnrollmentState(approved=tuple(approved), pending=frozenset(pending))
+    cache.set(key, state, ENROLLMENT_STATE_TIMEOUT if cache_is_shared() else LOCAL_ENROLLMENT_STATE_TIMEOUT)
+    return state
+
+
+def is_approved_for(student, course_id):
+    """Access check: a cache hit when every worker shares the cache, an EXISTS query otherwise."""
+    from .models import Enrollment
+
+    if cache_is_shared():
+        return get_enrollment_state(student).is_approved(course_id)
+    student_id = getattr(student, "pk", student)
+    return Enrollment.objects.filter(student_id=student_id, course_id=course_id, is_approved=True).exists()
+
+
+def invalidate_enrollment_state(*student_ids):
+    keys = [_enrollment_state_key(student_id) for student_id in student_ids]
+    if not keys:
+        return
+
+    cache.delete_many(keys)
+    # ✅ drop it again once the write is visible, so a concurrent reader
+    # can't re-cache the pre-commit rows
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+# ----------------------------
+# Published course catalog
+# ----------------------------
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # ✅ never restart from 1 after an eviction, old snapshots would come back
+        cache.add(CATALOG_VERSION_KEY, time.time_ns(), None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def bump_catalog_version():
+    # ✅ the version is the bump time, so readers can tell how fresh it is
+    cache.set(CATALOG_VERSION_KEY, time.time_ns(), None)
+
+
+def catalog_timeout():
+    # ✅ a version bump only reaches this worker's LocMemCache: cap how long the others lag
+    return CATALOG_TIMEOUT if cache_is_shared() else LOCAL_CATALOG_TIMEOUT
+
+
+def _catalog_reads(version):
+    """Read the catalog from the replica, unless it changed too recently to have replicated."""
+    age_seconds = (time.time_ns() - version) / 1e9
+    return replica_reads(enabled=age_seconds > getattr(settings, "REPLICA_PIN_SECONDS", 5))
+
+
+class CatalogPage(NamedTuple):
+    courses: list
+    next_cursor: str
+
+
+def encode_cursor(course):
+    raw = f"{course['created_at'].isoformat()}|{course['id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Returns (created_at, id), or None for a missing/garbled cursor."""
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, course_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(created_at), int(course_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+def get_catalog_page(cursor=None, page_size=CATALOG_PAGE_SIZE):
+    """
+    One page of the published catalog (newest first), keyset-paginated on
+    (created_at, id). Pages are cached per catalog version, so any course
+    save/delete retires every cached page at once.
+    """
+    from .models import Course
+
+    after = decode_cursor(cursor)
+    version = get_catalog_version()
+    key = f"courses:catalog:{version}:{page_size}:{cursor if after else ''}"
+
+    page = cache.get(key)
+    if page is not None:
+        return page
+
+    qs = Course.objects.published()
+    if after:
+        created_at, course_id = after
+        qs = qs.filter(
+            Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=course_id)
+        )
+
+    # ✅ fetch one extra row to know whether there is a next page
+    with _catalog_reads(version):
+        rows = list(qs.values(*CATALOG_FIELDS)[: page_size + 1])
+    courses = rows[:page_size]
+    next_cursor = encode_cursor(courses[-1]) if len(rows) > page_size else ""
+
+    page = CatalogPage(courses=courses, next_cursor=next_cursor)
+    cache.set(key, page, catalog_timeout())
+    return page
+
+
+def get_course_summaries(course_ids):
+    """Catalog rows for specific courses (e.g. a student's approved ones), in the given order."""
+    from .models import Course
+
+    version = get_catalog_version()
+    keys = {course_id: f"courses:summary:{version}:{course_id}" for course_id in course_ids}
+
+    cached = cache.get_many(keys.values())
+    found = {course_id: cached[key] for course_id, key in keys.items() if key in cached}
+
+    missing = [course_id for course_id in course_ids if course_id not in found]
+    if missing:
+        with _catalog_reads(version):
+            rows = Course.objects.published().filter(id__in=missing).values(*CATALOG_FIELDS)
+            fresh = {row["id"]: row for row in rows}
+        cache.set_many({keys[course_id]: row for course_id, row in fresh.items()}, catalog_timeout())
+        found.update(fresh)
+
+    return [found[course_id] for course_id in course_ids if course_id in found]
+
+
+# ----------------------------
+# Course outline (sections)
+# ----------------------------
+class CourseOutline(NamedTuple):
+    sections: list  # [{"id", "title"}], in position order
+    first_html: str
+
+
+def _outline_key(course_id):
+    return f"courses:outline:{course_id}"
+
+
+def get_course_outline(course_id):
+    """Section titles plus the first section's rendered HTML; the rest load on demand."""
+    from .models import CourseSection
+
+    key = _outline_key(course_id)
+    outline = cache.get(key)
+    if outline is not None:
+        return outline
+
+    sections = list(CourseSection.objects.filter(course_id=course_id).values("id", "title"))
+    first_html = ""
+    if sections:
+        first_html = CourseSection.objects.filter(pk=sections[0]["id"]).values_list("body_html", flat=True).first() or ""
+
+    outline = CourseOutline(sections=sections, first_html=first_html)
+    cache.set(key, outline, OUTLINE_TIMEOUT)
+    return outline
+
+
+def invalidate_course_outline(*course_ids):
+    keys = [_outline_key(course_id) for course_id in course_ids]
+    if not keys:
+        return
+
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
@@ -0,0 +1,199 @@
+"""
+Enrollment status pushed to the student's open "My Classes" page as
+server-sent events (courses.views.enrollment_events).
+
+Enrollment saves/deletes and bulk approvals publish the affected student
+ids once their transaction commits (see courses.signals). Every open stream
+waits on an asyncio.Queue for its student and re-reads the cached
+EnrollmentState when woken, so an idle stream costs one coroutine and one
+queue: no thread and no database connection.
+
+ENROLLMENT_EVENTS_BROKER picks the fan-out:
+- LocalBroker: in-process only (tests, a single worker)
+- PostgresBroker: pg_notify on publish, one LISTEN connection per worker process
+"""
+import asyncio
+import functools
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+from .cache import get_enrollment_state
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "enrollment_events"
+# ✅ pg_notify payloads are capped at 8000 bytes
+NOTIFY_BATCH = 500
+# a comment line every KEEPALIVE seconds keeps proxies from closing idle streams
+KEEPALIVE = getattr(settings, "ENROLLMENT_EVENTS_KEEPALIVE", 20)
+# streams end after this long; EventSource reconnects (and re-authenticates)
+STREAM_TIMEOUT = getattr(settings, "ENROLLMENT_EVENTS_STREAM_TIMEOUT", 300)
+# reconnect delay sent to the browser, in milliseconds
+RETRY_MS = getattr(settings, "ENROLLMENT_EVENTS_RETRY_MS", 5000)
+# under WSGI a stream would pin a worker: one event, then the browser polls
+POLL_RETRY_MS = getattr(settings, "ENROLLMENT_EVENTS_POLL_RETRY_MS", 30000)
+
+aget_enrollment_state = sync_to_async(get_enrollment_state)
+
+
+def _wake(queue):
+    # runs on the subscriber's loop; one pending wake-up is enough
+    if queue.empty():
+        queue.put_nowait(None)
+
+
+class LocalBroker:
+    def __init__(self):
+        # student_id -> {(loop, queue)}
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    @asynccontextmanager
+    async def subscribe(self, student_id):
+        """Yield a queue that receives a wake-up whenever ``student_id``'s enrollments change."""
+        entry = (asyncio.get_running_loop(), asyncio.Queue(maxsize=1))
+        with self._lock:
+            self._subscribers[student_id].add(entry)
+        try:
+            yield entry[1]
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(student_id)
+                if subscribers is not None:
+                    subscribers.discard(entry)
+                    if not subscribers:
+                        del self._subscribers[student_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(entries) for entries in self._subscribers.values())
+
+    def dispatch(self, student_ids=None):
+        """Wake the local streams of ``student_ids`` (all of them when None). Thread-safe."""
+        with self._lock:
+            if student_ids is None:
+                entries = [entry for subscribers in self._subscribers.values() for entry in subscribers]
+            else:
+                entries = [entry for student_id in student_ids for entry in self._subscribers.get(student_id, ())]
+
+        for loop, queue in entries:
+            try:
+                loop.call_soon_threadsafe(_wake, queue)
+            except RuntimeError:
+                # loop already closed; its stream is gone
+                pass
+
+    def publish(self, student_ids):
+        self.dispatch(student_ids)
+
+
+class PostgresBroker(LocalBroker):
+    """LocalBroker fed by LISTEN/NOTIFY, so every worker process sees every change."""
+
+    using = "default"
+
+    def __init__(self):
+        super().__init__()
+        # one listener task per event loop (normally one loop per worker)
+        self._listeners = {}
+
+    @asynccontextmanager
+    async def subscribe(self, student_id):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            listener = self._listeners.get(loop)
+            if listener is None or listener.done():
+                self._listeners[loop] = loop.create_task(self._listen())
+        async with super().subscribe(student_id) as queue:
+            yield queue
+
+    def publish(self, student_ids):
+        ids = [str(student_id) for student_id in student_ids]
+        with connections[self.using].cursor() as cursor:
+            for start in range(0, len(ids), NOTIFY_BATCH):
+                cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, ",".join(ids[start : start + NOTIFY_BATCH])])
+
+    def _conninfo(self):
+        from psycopg.conninfo import make_conninfo
+
+        db = connections[self.using].settings_dict
+        options = {key: value for key, value in db.get("OPTIONS", {}).items() if key in ("sslmode", "sslrootcert")}
+        params = {
+            "dbname": db["NAME"],
+            "user": db["USER"],
+            "password": db["PASSWORD"],
+            "host": db["HOST"],
+            "port": db["PORT"],
+            **options,
+        }
+        return make_conninfo(**{key: value for key, value in params.items() if value})
+
+    async def _listen(self):
+        import psycopg
+
+        backoff = 1
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self._conninfo(), autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {CHANNEL}")
+                    backoff = 1
+                    # ✅ anything sent while we were disconnected is lost: everyone re-reads
+                    self.dispatch()
+                    async for notify in conn.notifies():
+                        self.dispatch(int(student_id) for student_id in notify.payload.split(",") if student_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("enrollment events listener failed, reconnecting in %ss", backoff)
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+
+@functools.cache
+def get_broker():
+    return import_string(settings.ENROLLMENT_EVENTS_BROKER)()
+
+
+def publish_enrollment_change(*student_ids):
+    """Wake the event streams of ``student_ids`` once the current transaction commits."""
+    if not student_ids:
+        return
+    ids = list(dict.fromkeys(student_ids))
+    transaction.on_commit(lambda: get_broker().publish(ids))
+
+
+def format_event(state, retry=None):
+    data = json.dumps({"approved": list(state.approved), "pending": sorted(state.pending)})
+    prefix = f"retry: {retry}\n" if retry is not None else ""
+    return f"{prefix}event: enrollment\ndata: {data}\n\n"
+
+
+async def enrollment_event_stream(student_id, timeout=STREAM_TIMEOUT, keepalive=KEEPALIVE):
+    """The current state, then a new event whenever it changes, until ``timeout``."""
+    deadline = time.monotonic() + timeout
+
+    # ✅ subscribe before the first read, so no change can fall in between
+    async with get_broker().subscribe(student_id) as wakeups:
+        state = await aget_enrollment_state(student_id)
+        yield format_event(state, retry=RETRY_MS)
+
+        while (remaining := deadline - time.monotonic()) > 0:
+            try:
+                await asyncio.wait_for(wakeups.get(), min(keepalive, remaining))
+            except TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+
+            current = await aget_enrollment_state(student_id)
+            if current != state:
+                state = current
+                yield format_event(state)
@@ -0,0 +1,86 @@
+"""
+Reporting exports (admin actions and ``manage.py export_csv``): which
+columns go out and how the course / status / date filters apply.
+"""
+from datetime import datetime, time
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Enrollment
+
+ENROLLMENT_COLUMNS = (
+    ("enrollment_id", "id"),
+    ("student_id", "student_id"),
+    ("username", "student__username"),
+    ("email", "student__email"),
+    ("first_name", "student__first_name"),
+    ("last_name", "student__last_name"),
+    ("course_id", "course_id"),
+    ("course_slug", "course__slug"),
+    ("course_title", "course__title"),
+    ("is_approved", "is_approved"),
+    ("requested_at", "requested_at"),
+    ("approved_at", "approved_at"),
+)
+
+USER_COLUMNS = (
+    ("user_id", "id"),
+    ("username", "username"),
+    ("email", "email"),
+    ("first_name", "first_name"),
+    ("middle_name", "middle_name"),
+    ("last_name", "last_name"),
+    ("is_student", "is_student"),
+    ("is_teacher", "is_teacher"),
+    ("is_authorized", "is_authorized"),
+    ("is_staff", "is_staff"),
+    ("date_joined", "date_joined"),
+    ("last_login", "last_login"),
+)
+
+ENROLLMENT_STATUSES = {"approved": True, "pending": False}
+USER_STATUSES = {"verified": True, "unverified": False}
+
+
+def parse_when(value):
+    """An aware datetime from an ISO date or datetime, or None if it doesn't parse."""
+    dt = parse_datetime(value)
+    if dt is None:
+        d = parse_date(value)
+        if d is None:
+            return None
+        dt = datetime.combine(d, time.min)
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+def filter_enrollments(queryset=None, course=None, status=None, since=None, until=None):
+    """Enrollments of the ``course`` slug, approved/pending, requested in [since, until)."""
+    queryset = Enrollment.objects.all() if queryset is None else queryset
+    if course:
+        queryset = queryset.filter(course__slug=course)
+    if status:
+        queryset = queryset.filter(is_approved=ENROLLMENT_STATUSES[status])
+    if since:
+        queryset = queryset.filter(requested_at__gte=since)
+    if until:
+        queryset = queryset.filter(requested_at__lt=until)
+    return queryset
+
+
+def filter_users(queryset=None, course=None, status=None, since=None, until=None):
+    """Users enrolled in the ``course`` slug, verified/unverified, joined in [since, until)."""
+    queryset = get_user_model().objects.all() if queryset is None else queryset
+    if course:
+        # ✅ a subquery, not a join: one row per user without DISTINCT
+        queryset = queryset.filter(pk__in=Enrollment.objects.filter(course__slug=course).values("student_id"))
+    if status:
+        queryset = queryset.filter(is_authorized=USER_STATUSES[status])
+    if since:
+        queryset = queryset.filter(date_joined__gte=since)
+    if until:
+        queryset = queryset.filter(date_joined__lt=until)
+    return queryset
@@ -0,0 +1,43 @@
+from datetime import datetime, time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from courses.models import Course, Enrollment
+
+
+def parse_cutoff(value):
+    dt = parse_datetime(value)
+    if dt is None:
+        d = parse_date(value)
+        if d is None:
+            raise CommandError(f"Invalid --requested-before value: {value!r}")
+        dt = datetime.combine(d, time.min)
+    if timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+class Command(BaseCommand):
+    help = "Approve all pending enrollments for a course in bulk."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--course", required=True, help="Course slug")
+        parser.add_argument(
+            "--requested-before",
+            help="Only approve requests made before this date/datetime (ISO format)",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        course = Course.objects.filter(slug=options["course"]).first()
+        if course is None:
+            raise CommandError(f"No course with slug {options['course']!r}")
+
+        enrollments = Enrollment.objects.filter(course=course)
+        if options["requested_before"]:
+            enrollments = enrollments.filter(requested_at__lt=parse_cutoff(options["requested_before"]))
+
+        approved = enrollments.approve(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Approved {approved} enrollment(s) for {course.slug}."))
@@ -0,0 +1,196 @@
+import random
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from courses.cache import bump_catalog_version
+from courses.models import Course, CourseSection, Enrollment
+
+User = get_user_model()
+
+SEED_PREFIX = "seed"
+SEED_PASSWORD = "seed-password-123"
+
+
+def bulk_insert(model, objs, batch_size):
+    """INSERT ``objs`` without signals: COPY on Postgres, batched bulk_create elsewhere."""
+    if connection.vendor != "postgresql":
+        objs = iter(objs)
+        # ✅ one batch in memory at a time (bulk_create would list() everything)
+        while batch := list(islice(objs, batch_size)):
+            model.objects.bulk_create(batch)
+        return
+
+    fields = [f for f in model._meta.concrete_fields if not f.primary_key]
+    table = connection.ops.quote_name(model._meta.db_table)
+    columns = ", ".join(connection.ops.quote_name(f.column) for f in fields)
+    with connection.cursor() as cursor:
+        with cursor.cursor.copy(f"COPY {table} ({columns}) FROM STDIN") as copy:
+            for obj in objs:
+                copy.write_row([f.get_db_prep_save(f.pre_save(obj, True), connection) for f in fields])
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a large synthetic dataset (students, courses, enrollments) for "
+        "benchmarking. All rows are prefixed so they can be removed with --clear."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=10000)
+        parser.add_argument("--courses", type=int, default=200)
+        parser.add_argument(
+            "--enrollments-per-student",
+            type=float,
+            default=4,
+            help="Average enrollment requests per student (popular courses get more)",
+        )
+        parser.add_argument("--sections-per-course", type=int, default=6)
+        parser.add_argument("--approved-ratio", type=float, default=0.7)
+        parser.add_argument("--unpublished-ratio", type=float, default=0.1)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=42, help="Random seed (same seed, same dataset)")
+        parser.add_argument("--prefix", default=SEED_PREFIX)
+        parser.add_argument("--clear", action="store_true", help="Delete previously seeded rows first")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        prefix = options["prefix"]
+        batch_size = options["batch_size"]
+
+        if options["clear"]:
+            self.clear(prefix)
+
+        started = time.monotonic()
+        with transaction.atomic():
+            course_ids = self.seed_courses(rng, prefix, options["courses"], options["unpublished_ratio"], batch_size)
+            sections = self.seed_sections(course_ids, options["sections_per_course"], batch_size)
+            student_ids = self.seed_students(prefix, options["students"], batch_size)
+            enrollments = self.seed_enrollments(
+                rng,
+                student_ids,
+                course_ids,
+                options["enrollments_per_student"],
+                options["approved_ratio"],
+                batch_size,
+            )
+
+        # ✅ bulk inserts skip post_save: new catalog version by hand
+        bump_catalog_version()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(student_ids)} students, {len(course_ids)} courses ({sections} sections) and "
+                f"{enrollments} enrollments in {time.monotonic() - started:.1f}s "
+                f"(password for every seeded student: {SEED_PASSWORD})."
+            )
+        )
+
+    def clear(self, prefix):
+        # enrollments go with their users/courses (CASCADE)
+        users, _ = User.objects.filter(username__startswith=f"{prefix}-").delete()
+        courses, _ = Course.objects.filter(slug__startswith=f"{prefix}-").delete()
+        self.stdout.write(f"Cleared {users + courses} previously seeded row(s).")
+
+    def seed_courses(self, rng, prefix, count, unpublished_ratio, batch_size):
+        start = Course.objects.filter(slug__startswith=f"{prefix}-").count()
+        bulk_insert(
+            Course,
+            (
+                Course(
+                    title=f"Course {n}",
+                    slug=f"{prefix}-course-{n}",
+                    short_description=f"Synthetic course {n} for load testing.",
+                    description="Lorem ipsum dolor sit amet. " * 40,
+                    is_published=rng.random() >= unpublished_ratio,
+                )
+                for n in range(start, start + count)
+            ),
+            batch_size,
+        )
+        return list(
+            Course.objects.filter(slug__startswith=f"{prefix}-").order_by("pk").values_list("pk", flat=True)[start:]
+        )
+
+    def seed_sections(self, course_ids, per_course, batch_size):
+        def rows():
+            for course_id in course_ids:
+                for position in range(per_course):
+                    section = CourseSection(
+                        course_id=course_id,
+                        title=f"Lesson {position + 1}",
+                        position=position,
+                        body="\n\n".join(["Lorem ipsum dolor sit amet, consectetur adipiscing elit. " * 8] * 6),
+                    )
+                    # bulk inserts skip save(): render here
+                    section.render()
+                    yield section
+
+        bulk_insert(CourseSection, rows(), batch_size)
+        return len(course_ids) * per_course
+
+    def seed_students(self, prefix, count, batch_size):
+        # ✅ hash once: PBKDF2 per row would dominate the run
+        password = make_password(SEED_PASSWORD)
+        start = User.objects.filter(username__startswith=f"{prefix}-student-").count()
+        bulk_insert(
+            User,
+            (
+                User(
+                    username=f"{prefix}-student-{n}",
+                    email=f"{prefix}-student-{n}@example.com",
+                    first_name="Seed",
+                    last_name=f"Student {n}",
+                    password=password,
+                    is_student=True,
+                    is_authorized=True,
+                )
+                for n in range(start, start + count)
+            ),
+            batch_size,
+        )
+        return list(
+            User.objects.filter(username__startswith=f"{prefix}-student-")
+            .order_by("pk")
+            .values_list("pk", flat=True)[start:]
+        )
+
+    def seed_enrollments(self, rng, student_ids, course_ids, per_student, approved_ratio, batch_size):
+        if not student_ids or not course_ids:
+            return 0
+
+        # ✅ long-tail popularity: course k is requested ~1/(k+1) as often as the first
+        weights = [1 / (k + 1) for k in range(len(course_ids))]
+        now = timezone.now()
+
+        def rows():
+            for student_id in student_ids:
+                wanted = min(len(course_ids), max(0, round(rng.expovariate(1 / per_student)))) if per_student else 0
+                chosen = set()
+                while len(chosen) < wanted:
+                    chosen.update(rng.choices(course_ids, weights, k=wanted - len(chosen)))
+                for course_id in chosen:
+                    approved = rng.random() < approved_ratio
+                    yield Enrollment(
+                        student_id=student_id,
+                        course_id=course_id,
+                        is_approved=approved,
+                        approved_at=now - timedelta(minutes=rng.randrange(60 * 24 * 90)) if approved else None,
+                    )
+
+        created = 0
+
+        def counted():
+            nonlocal created
+            for row in rows():
+                created += 1
+                yield row
+
+        bulk_insert(Enrollment, counted(), batch_size)
+        return created
@@ -0,0 +1,81 @@
+from django.db import migrations
+
+# Postgres: a generated, weighted tsvector column (kept current by the
+# database on every INSERT/UPDATE) with a GIN index.
+POSTGRES_FORWARDS = [
+    """
+    ALTER TABLE courses_course ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(short_description, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(description, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX course_search_vector_idx ON courses_course USING GIN (search_vector)",
+]
+POSTGRES_BACKWARDS = [
+    "DROP INDEX IF EXISTS course_search_vector_idx",
+    "ALTER TABLE courses_course DROP COLUMN IF EXISTS search_vector",
+]
+
+# SQLite: an external-content FTS5 table over courses_course, kept in sync by
+# triggers. NB: a later migration that makes Django rebuild courses_course on
+# SQLite (most AlterField/RemoveField) drops these triggers with the old table;
+# it must re-create them and 'rebuild' courses_course_fts afterwards.
+SQLITE_FORWARDS = [
+    """
+    CREATE VIRTUAL TABLE courses_course_fts USING fts5(
+        title, short_description, description,
+        content='courses_course', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER courses_course_fts_ai AFTER INSERT ON courses_course BEGIN
+        INSERT INTO courses_course_fts(rowid, title, short_description, description)
+        VALUES (new.id, new.title, new.short_description, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER courses_course_fts_ad AFTER DELETE ON courses_course BEGIN
+        INSERT INTO courses_course_fts(courses_course_fts, rowid, title, short_description, description)
+        VALUES ('delete', old.id, old.title, old.short_description, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER courses_course_fts_au AFTER UPDATE ON courses_course BEGIN
+        INSERT INTO courses_course_fts(courses_course_fts, rowid, title, short_description, description)
+        VALUES ('delete', old.id, old.title, old.short_description, old.description);
+        INSERT INTO courses_course_fts(rowid, title, short_description, description)
+        VALUES (new.id, new.title, new.short_description, new.description);
+    END
+    """,
+    "INSERT INTO courses_course_fts(courses_course_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS courses_course_fts_ai",
+    "DROP TRIGGER IF EXISTS courses_course_fts_ad",
+    "DROP TRIGGER IF EXISTS courses_course_fts_au",
+    "DROP TABLE IF EXISTS courses_course_fts",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        # other backends keep the icontains fallback in courses.search
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0004_catalog_keyset_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({"postgresql": POSTGRES_FORWARDS, "sqlite": SQLITE_FORWARDS}),
+            _run({"postgresql": POSTGRES_BACKWARDS, "sqlite": SQLITE_BACKWARDS}),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.9 on 2026-10-18 06:34
+
+import hashlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils.html import linebreaks
+
+BATCH = 500
+
+
+def description_to_section(apps, schema_editor):
+    """Each existing course's description becomes its first section."""
+    Course = apps.get_model("courses", "Course")
+    CourseSection = apps.get_model("courses", "CourseSection")
+
+    # ✅ flushed every BATCH sections: memory stays flat however many courses exist
+    sections = []
+    for course in Course.objects.exclude(description="").only("id", "description").iterator(chunk_size=BATCH):
+        body_html = linebreaks(course.description, autoescape=True)
+        sections.append(
+            CourseSection(
+                course_id=course.id,
+                title="Overview",
+                position=0,
+                body=course.description,
+                body_html=body_html,
+                html_digest=hashlib.sha256(body_html.encode()).hexdigest(),
+            )
+        )
+        if len(sections) >= BATCH:
+            CourseSection.objects.bulk_create(sections)
+            sections = []
+    CourseSection.objects.bulk_create(sections)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_enrollment_pending_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CourseSection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('body', models.TextField(blank=True)),
+                ('body_html', models.TextField(blank=True, editable=False)),
+                ('html_digest', models.CharField(blank=True, editable=False, max_length=64)),
+                ('course', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sections', to='courses.course')),
+            ],
+            options={
+                'ordering': ('position', 'id'),
+                'indexes': [models.Index(fields=['course', 'position', 'id'], name='section_course_position_idx')],
+            },
+        ),
+        migrations.RunPython(description_to_section, migrations.RunPython.noop),
+    ]
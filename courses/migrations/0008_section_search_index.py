@@ -0,0 +1,77 @@
+from django.db import migrations
+
+# Section titles and bodies join the course search index (migration 0005):
+# a course matches when its own fields or any of its sections do.
+
+# Postgres: the same generated tsvector + GIN index, on courses_coursesection.
+POSTGRES_FORWARDS = [
+    """
+    ALTER TABLE courses_coursesection ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(body, '')), 'D')
+    ) STORED
+    """,
+    "CREATE INDEX section_search_vector_idx ON courses_coursesection USING GIN (search_vector)",
+]
+POSTGRES_BACKWARDS = [
+    "DROP INDEX IF EXISTS section_search_vector_idx",
+    "ALTER TABLE courses_coursesection DROP COLUMN IF EXISTS search_vector",
+]
+
+# SQLite: an external-content FTS5 table over courses_coursesection, kept in
+# sync by triggers (the same caveat about table rebuilds as in 0005 applies).
+SQLITE_FORWARDS = [
+    """
+    CREATE VIRTUAL TABLE courses_coursesection_fts USING fts5(
+        title, body,
+        content='courses_coursesection', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    """
+    CREATE TRIGGER courses_coursesection_fts_ai AFTER INSERT ON courses_coursesection BEGIN
+        INSERT INTO courses_coursesection_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER courses_coursesection_fts_ad AFTER DELETE ON courses_coursesection BEGIN
+        INSERT INTO courses_coursesection_fts(courses_coursesection_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER courses_coursesection_fts_au AFTER UPDATE ON courses_coursesection BEGIN
+        INSERT INTO courses_coursesection_fts(courses_coursesection_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+        INSERT INTO courses_coursesection_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    "INSERT INTO courses_coursesection_fts(courses_coursesection_fts) VALUES ('rebuild')",
+]
+SQLITE_BACKWARDS = [
+    "DROP TRIGGER IF EXISTS courses_coursesection_fts_ai",
+    "DROP TRIGGER IF EXISTS courses_coursesection_fts_ad",
+    "DROP TRIGGER IF EXISTS courses_coursesection_fts_au",
+    "DROP TABLE IF EXISTS courses_coursesection_fts",
+]
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0007_coursesection'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            _run({"postgresql": POSTGRES_FORWARDS, "sqlite": SQLITE_FORWARDS}),
+            _run({"postgresql": POSTGRES_BACKWARDS, "sqlite": SQLITE_BACKWARDS}),
+        ),
+    ]
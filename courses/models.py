@@ -1,7 +1,39 @@
+import hashlib
+
 from django.db import models
+from django.db.models import Case, F, FilteredRelation, Q, Value, When
 from django.utils.text import slugify
 from django.conf import settings
 from django.utils import timezone
+from django.utils.html import linebreaks
+
+
+class CourseQuerySet(models.QuerySet):
+    def published(self):
+        return self.filter(is_published=True).order_by("-created_at", "-id")
+
+    def with_enrollment_state(self, student):
+        """
+        Annotate each course with the given student's enrollment:
+        ``enrollment_state`` ("none" / "pending" / "approved"),
+        ``enrollment_approved_at`` and ``enrollment_requested_at``.
+        One LEFT JOIN, so the course and the state are a single query.
+        """
+        return self.annotate(
+            student_enrollment=FilteredRelation(
+                "enrollment",
+                condition=Q(enrollment__student=student),
+            ),
+        ).annotate(
+            enrollment_state=Case(
+                When(student_enrollment__id__isnull=True, then=Value("none")),
+                When(student_enrollment__is_approved=True, then=Value("approved")),
+                default=Value("pending"),
+                output_field=models.CharField(),
+            ),
+            enrollment_approved_at=F("student_enrollment__approved_at"),
+            enrollment_requested_at=F("student_enrollment__requested_at"),
+        )
 
 
 class Course(models.Model):
@@ -12,6 +44,14 @@ class Course(models.Model):
     is_published = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = CourseQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # ✅ keyset pagination of the catalog on (created_at, id)
+            models.Index(fields=["is_published", "created_at", "id"], name="course_published_keyset_idx"),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
@@ -21,6 +61,76 @@ class Course(models.Model):
         return self.title
 
 
+class CourseSection(models.Model):
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="sections")
+    title = models.CharField(max_length=200)
+    position = models.PositiveIntegerField(default=0)
+    body = models.TextField(blank=True)
+
+    # ✅ rendered once on save, served as-is (course_detail / course_section)
+    body_html = models.TextField(blank=True, editable=False)
+    html_digest = models.CharField(max_length=64, blank=True, editable=False)
+
+    class Meta:
+        ordering = ("position", "id")
+        indexes = [
+            models.Index(fields=["course", "position", "id"], name="section_course_position_idx"),
+        ]
+
+    def render(self):
+        self.body_html = linebreaks(self.body, autoescape=True)
+        self.html_digest = hashlib.sha256(self.body_html.encode()).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.render()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "body" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "body_html", "html_digest"}
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.title
+
+
+class EnrollmentQuerySet(models.QuerySet):
+    def approve(self, chunk_size=1000):
+        """
+        Approve every pending enrollment in this queryset with set-based
+        UPDATEs of at most ``chunk_size`` rows, firing one
+        ``enrollments_approved`` signal per chunk (no per-row post_save).
+        Returns the number of rows approved.
+        """
+        from .signals import enrollments_approved
+
+        now = timezone.now()
+        pending = self.filter(is_approved=False).order_by("pk")
+        approved = 0
+        last_pk = 0
+
+        while True:
+            chunk = list(pending.filter(pk__gt=last_pk).values_list("pk", "student_id", "course_id")[:chunk_size])
+            if not chunk:
+                break
+
+            last_pk = chunk[-1][0]
+            updated = Enrollment.objects.filter(
+                pk__in=[pk for pk, _, _ in chunk],
+                is_approved=False,
+            ).update(is_approved=True, approved_at=now)
+            approved += updated
+
+            # ✅ per chunk: if a later chunk fails, the rows already committed
+            # have still invalidated their caches and notified their students
+            if updated:
+                enrollments_approved.send(
+                    sender=Enrollment,
+                    student_ids={student_id for _, student_id, _ in chunk},
+                    course_ids={course_id for _, _, course_id in chunk},
+                    approved_at=now,
+                )
+        return approved
+
+
 class Enrollment(models.Model):
     student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     course = models.ForeignKey(Course, on_delete=models.CASCADE)
@@ -32,8 +142,16 @@ class Enrollment(models.Model):
     requested_at = models.DateTimeField(auto_now_add=True)
     approved_at = models.DateTimeField(null=True, blank=True)
 
+    objects = EnrollmentQuerySet.as_manager()
+
     class Meta:
         unique_together = ("student", "course")
+        indexes = [
+            # ✅ backs the "my approved courses" lookup on student_courses
+            models.Index(fields=["student", "is_approved", "approved_at"], name="enroll_student_approved_idx"),
+            # ✅ the admin approval queue (is_approved=False, newest first) without scanning approved rows
+            models.Index(fields=["-id"], condition=models.Q(is_approved=False), name="enroll_pending_idx"),
+        ]
 
     def approve(self):
         self.is_approved = True
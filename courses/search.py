@@ -0,0 +1,166 @@
+"""
+Full-text course search over title, short_description, description and the
+title and body of every section.
+
+Postgres uses the generated, GIN-indexed ``search_vector`` columns, ranked with
+ts_rank; SQLite uses the ``courses_course_fts`` and ``courses_coursesection_fts``
+FTS5 tables, ranked with bm25. Both come from migrations 0005 and 0008 and are
+kept current by the database on every save. Courses whose own fields match
+rank ahead of courses that only match in a section. Any other backend falls
+back to icontains on title/short_description.
+"""
+import hashlib
+import re
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, router
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .cache import CATALOG_FIELDS, CATALOG_PAGE_SIZE, _catalog_reads, catalog_timeout, get_catalog_version
+
+# ✅ bounds the OFFSET a ranked query can be asked for
+SEARCH_MAX_PAGES = getattr(settings, "COURSE_SEARCH_MAX_PAGES", 50)
+WORD_RE = re.compile(r"\w+")
+
+
+class SearchPage(NamedTuple):
+    courses: list
+    page: int
+    has_next: bool
+
+
+def normalize_query(query):
+    """Lower-cased words only: no tsquery/FTS5 syntax ever reaches the database."""
+    return " ".join(WORD_RE.findall(query.lower())[:20])
+
+
+def _match_param(terms, vendor):
+    # every word must match; the last one as a prefix (search-as-you-type)
+    words = terms.split()
+    if vendor == "postgresql":
+        return " & ".join(words[:-1] + [f"{words[-1]}:*"])
+    return " ".join([f'"{w}"' for w in words[:-1]] + [f'"{words[-1]}"*'])
+
+
+def matching_ids_sql(terms, using="default"):
+    """(sql, params) selecting the ids of courses matching ``terms``, or None without an index."""
+    vendor = connections[using].vendor
+    if vendor == "postgresql":
+        match = _match_param(terms, vendor)
+        return (
+            "SELECT id FROM courses_course WHERE search_vector @@ to_tsquery('english', %s) "
+            "UNION SELECT course_id FROM courses_coursesection WHERE search_vector @@ to_tsquery('english', %s)",
+            [match, match],
+        )
+    if vendor == "sqlite":
+        match = _match_param(terms, vendor)
+        return (
+            "SELECT rowid FROM courses_course_fts WHERE courses_course_fts MATCH %s "
+            "UNION SELECT s.course_id FROM courses_coursesection_fts "
+            "JOIN courses_coursesection s ON s.id = courses_coursesection_fts.rowid "
+            "WHERE courses_coursesection_fts MATCH %s",
+            [match, match],
+        )
+    return None
+
+
+def _ranked_ids(terms, using, limit, offset):
+    vendor = connections[using].vendor
+    if vendor == "postgresql":
+        # tier 0: the course itself matches, tier 1: only a section does
+        sql = """
+            SELECT c.id FROM courses_course c
+            JOIN (
+                SELECT id AS course_id, 0 AS tier, ts_rank(search_vector, q) AS score
+                FROM courses_course, to_tsquery('english', %s) q WHERE search_vector @@ q
+                UNION ALL
+                SELECT course_id, 1, ts_rank(search_vector, q)
+                FROM courses_coursesection, to_tsquery('english', %s) q WHERE search_vector @@ q
+            ) m ON m.course_id = c.id
+            WHERE c.is_published
+            GROUP BY c.id
+            ORDER BY MIN(m.tier), MAX(m.score) DESC, c.id DESC
+            LIMIT %s OFFSET %s
+        """
+        match = _match_param(terms, vendor)
+        params = [match, match, limit, offset]
+    elif vendor == "sqlite":
+        # bm25 weights: title > short_description > description, section title > body
+        # (lower is better); tiers as above
+        sql = """
+            SELECT c.id FROM courses_course c
+            JOIN (
+                SELECT rowid AS course_id, 0 AS tier, bm25(courses_course_fts, 10.0, 4.0, 1.0) AS score
+                FROM courses_course_fts WHERE courses_course_fts MATCH %s
+                UNION ALL
+                SELECT s.course_id, 1, bm25(courses_coursesection_fts, 4.0, 1.0)
+                FROM courses_coursesection_fts
+                JOIN courses_coursesection s ON s.id = courses_coursesection_fts.rowid
+                WHERE courses_coursesection_fts MATCH %s
+            ) m ON m.course_id = c.id
+            WHERE c.is_published
+            GROUP BY c.id
+            ORDER BY MIN(m.tier), MIN(m.score), c.id DESC
+            LIMIT %s OFFSET %s
+        """
+        match = _match_param(terms, vendor)
+        params = [match, match, limit, offset]
+    else:
+        return None
+
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_courses(query, page=1, page_size=CATALOG_PAGE_SIZE):
+    """
+    One page of published courses matching ``query``, best match first.
+    Cached per catalog version, like the catalog pages.
+    """
+    from .models import Course
+
+    terms = normalize_query(query)
+    page = max(1, min(page, SEARCH_MAX_PAGES))
+    if not terms:
+        return SearchPage(courses=[], page=page, has_next=False)
+
+    version = get_catalog_version()
+    key = f"courses:search:{version}:{page_size}:{page}:{hashlib.sha256(terms.encode()).hexdigest()}"
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    offset = (page - 1) * page_size
+    with _catalog_reads(version):
+        # ✅ one extra id tells whether there is a next page
+        ids = _ranked_ids(terms, router.db_for_read(Course), page_size + 1, offset)
+        if ids is None:
+            ids = list(
+                Course.objects.published()
+                .filter(Q(title__icontains=terms) | Q(short_description__icontains=terms))
+                .values_list("id", flat=True)[offset : offset + page_size + 1]
+            )
+        rows = {row["id"]: row for row in Course.objects.filter(id__in=ids[:page_size]).values(*CATALOG_FIELDS)}
+
+    result = SearchPage(
+        courses=[rows[course_id] for course_id in ids[:page_size] if course_id in rows],
+        page=page,
+        has_next=len(ids) > page_size and page < SEARCH_MAX_PAGES,
+    )
+    cache.set(key, result, catalog_timeout())
+    return result
+
+
+def filter_matching(queryset, query):
+    """``queryset`` narrowed to full-text matches (admin search), or None without an index."""
+    terms = normalize_query(query)
+    if not terms:
+        return queryset
+    matching = matching_ids_sql(terms, queryset.db)
+    if matching is None:
+        return None
+    return queryset.filter(pk__in=RawSQL(*matching))
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import Signal, receiver
+
+from .cache import bump_catalog_version, invalidate_course_outline, invalidate_enrollment_state
+from .events import publish_enrollment_change
+from .models import Course, CourseSection, Enrollment
+
+# ✅ sent once per approved chunk of a bulk approval (Enrollment.objects...approve()),
+# kwargs: student_ids, course_ids, approved_at
+enrollments_approved = Signal()
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def enrollment_changed(sender, instance, **kwargs):
+    invalidate_enrollment_state(instance.student_id)
+    # ✅ after the cache delete: woken streams must re-read the new state
+    publish_enrollment_change(instance.student_id)
+
+
+@receiver(enrollments_approved)
+def enrollments_bulk_approved(sender, student_ids, **kwargs):
+    invalidate_enrollment_state(*student_ids)
+    publish_enrollment_change(*student_ids)
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def course_changed(sender, instance, **kwargs):
+    bump_catalog_version()
+
+
+@receiver(post_save, sender=CourseSection)
+@receiver(post_delete, sender=CourseSection)
+def section_changed(sender, instance, **kwargs):
+    invalidate_course_outline(instance.course_id)
+    # section text is searchable: cached search pages go with the catalog version
+    bump_catalog_version()
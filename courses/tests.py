@@ -1,3 +1,558 @@
-from django.test import TestCase
+import asyncio
+import csv
+import json
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.management import call_command
+from django.db import connections
+from django.http import HttpResponse
+from django.test import (
+    AsyncClient,
+    AsyncRequestFactory,
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+
+from config.csv_export import csv_chunks, streaming_csv_response
+from config.db_router import PIN_COOKIE, REPLICA, PrimaryPinningMiddleware, replica_reads
+from config.query_budget import CHANGELIST_SCANS, assert_query_budget, budget_for
+from config.testing import TEST_STORAGES, SeededTestCase
+from .cache import (
+    LOCAL_CATALOG_TIMEOUT,
+    LOCAL_ENROLLMENT_STATE_TIMEOUT,
+    get_catalog_page,
+    get_enrollment_state,
+    is_approved_for,
+)
+from .export import ENROLLMENT_COLUMNS
+from .events import LocalBroker, enrollment_event_stream, get_broker
+from .models import Course, CourseSection, Enrollment
+from .signals import enrollments_approved
+from .views import request_course
+
+User = get_user_model()
+
+
+class CourseViewBudgetTests(SeededTestCase):
+    def test_student_courses(self):
+        self.assertWithinBudget(self.student_client, reverse("student_courses"))
+
+    def test_student_courses_next_page(self):
+        response = self.student_client.get(reverse("student_courses"), secure=True)
+        cursor = response.context["next_cursor"]
+        self.assertWithinBudget(self.student_client, reverse("student_courses") + f"?after={cursor}")
+
+    def test_course_detail(self):
+        self.assertWithinBudget(self.student_client, reverse("course_detail", args=[self.course.pk]))
+
+    def test_course_section(self):
+        section = self.course.sections.order_by("position").last()
+        url = reverse("course_section", args=[self.course.pk, section.pk])
+        etag = self.assertWithinBudget(self.student_client, url)["ETag"]
+        self.assertWithinBudget(self.student_client, url, HTTP_IF_NONE_MATCH=etag)
+
+    def test_enrollment_events(self):
+        # the test client is WSGI: one event, no stream
+        self.assertWithinBudget(self.student_client, reverse("enrollment_events"))
+
+    def test_request_course(self):
+        # not routed: call the view directly
+        course = Course.objects.published().exclude(enrollment__student=self.student).first()
+        request = RequestFactory().post("/", secure=True)
+        request.user = self.student
+        cache.clear()
+        with assert_query_budget(budget_for(request_course), "request_course"):
+            request_course(request, course.pk)
+        self.assertTrue(Enrollment.objects.filter(student=self.student, course=course).exists())
+
+
+class CourseAdminBudgetTests(SeededTestCase):
+    # ✅ the paginator's COUNT(*) and the index-ordered page may scan; nothing else
+    def test_course_changelist(self):
+        self.assertWithinBudget(self.admin_client, reverse("admin:courses_course_changelist"))
+
+    def test_enrollment_changelist(self):
+        # list_display walks student/course: must stay one query for the page
+        self.assertWithinBudget(
+            self.admin_client, reverse("admin:courses_enrollment_changelist"), allowed_scans=CHANGELIST_SCANS
+        )
+
+    def test_enrollment_changelist_search(self):
+        url = reverse("admin:courses_enrollment_changelist") + f"?q={self.student.username}"
+        response = self.assertWithinBudget(self.admin_client, url)
+        results = response.context["cl"].result_list
+        self.assertTrue(results)
+        self.assertTrue(all(e.student.username.startswith(self.student.username) for e in results))
+
+    def test_enrollment_changelist_broad_search_is_complete(self):
+        # a prefix shared by all 1200 seeded students: every enrollment is counted
+        prefix = self.student.username.rsplit("-", 1)[0] + "-"
+        url = reverse("admin:courses_enrollment_changelist") + f"?q={prefix}"
+        response = self.assertWithinBudget(self.admin_client, url)
+        self.assertEqual(
+            response.context["cl"].result_count,
+            Enrollment.objects.filter(student__username__startswith=prefix).count(),
+        )
+
+    def test_enrollment_changelist_filtered(self):
+        url = reverse("admin:courses_enrollment_changelist") + f"?is_approved__exact=0&course__id__exact={self.course.pk}"
+        self.assertWithinBudget(self.admin_client, url)
+
+    def test_course_search(self):
+        self.assertWithinBudget(self.student_client, reverse("course_search") + "?q=synthetic+cour")
+
+
+@override_settings(DATABASE_ROUTERS=["config.db_router.PrimaryReplicaRouter"], STORAGES=TEST_STORAGES)
+class ReplicaRoutingTests(TransactionTestCase):
+    """The router against two SQLite databases: the test database and a replica file."""
+
+    # "__all__": the test runner only knows "default"; the replica joins in setUpClass
+    databases = "__all__"
+
+    @classmethod
+    def setUpClass(cls):
+        # ✅ registered before TransactionTestCase resolves ``databases``
+        replica_dir = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(replica_dir.cleanup)
+        connections.settings[REPLICA] = connections.configure_settings(
+            {
+                "default": connections.settings["default"],
+                REPLICA: {"ENGINE": "django.db.backends.sqlite3", "NAME": str(Path(replica_dir.name) / "replica.sqlite3")},
+            }
+        )[REPLICA]
+        cls.addClassCleanup(connections.settings.pop, REPLICA)
+        cls.addClassCleanup(connections[REPLICA].close)
+        super().setUpClass()
+
+    def setUp(self):
+        # the replica has only what replication would have brought over
+        with connections[REPLICA].schema_editor() as editor:
+            editor.create_model(Course)
+        self.addCleanup(self.drop_replica_table)
+        Course.objects.create(title="On the primary", short_description="", description="")
+        Course.objects.using(REPLICA).create(title="On the replica", short_description="", description="")
+
+    def drop_replica_table(self):
+        with connections[REPLICA].schema_editor() as editor:
+            editor.delete_model(Course)
+
+    def titles(self):
+        with replica_reads():
+            return list(Course.objects.values_list("title", flat=True))
+
+    def test_reads_go_to_the_replica_only_when_asked(self):
+        self.assertEqual(self.titles(), ["On the replica"])
+        self.assertEqual(list(Course.objects.values_list("title", flat=True)), ["On the primary"])
+
+    def test_a_write_pins_the_rest_of_the_request(self):
+        seen = []
+
+        def view(request):
+            seen.append(self.titles())
+            Course.objects.create(title="Written", short_description="", description="")
+            seen.append(self.titles())
+            return HttpResponse()
+
+        response = PrimaryPinningMiddleware(view)(RequestFactory().get("/"))
+        self.assertEqual(seen, [["On the replica"], ["On the primary", "Written"]])
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+        # the pin ended with the request
+        self.assertEqual(self.titles(), ["On the replica"])
+
+    def test_pin_cookie_keeps_the_next_request_on_the_primary(self):
+        seen = []
+
+        def view(request):
+            seen.append(self.titles())
+            return HttpResponse()
+
+        request = RequestFactory().get("/")
+        request.COOKIES[PIN_COOKIE] = "1"
+        response = PrimaryPinningMiddleware(view)(request)
+        self.assertEqual(seen, [["On the primary"]])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_writes_outside_a_request_do_not_pin(self):
+        # e.g. a management command
+        Course.objects.create(title="From a command", short_description="", description="")
+        self.assertEqual(self.titles(), ["On the replica"])
+
+    def test_admin_changelist_reads_the_replica(self):
+        self.client.force_login(User.objects.create_superuser("replica-admin", "replica-admin@example.com", "pw"))
+        response = self.client.get(reverse("admin:courses_course_changelist"), secure=True)
+        self.assertEqual([course.title for course in response.context["cl"].result_list], ["On the replica"])
+
+    def test_migrate_leaves_the_replica_alone(self):
+        call_command("migrate", database=REPLICA, verbosity=0)
+        self.assertNotIn("courses_enrollment", connections[REPLICA].introspection.table_names())
+
+
+class EnrollmentApproveTests(TestCase):
+    def test_signal_per_committed_chunk(self):
+        course = Course.objects.create(title="Chunked", short_description="", description="")
+        for n in range(3):
+            student = User.objects.create_user(f"chunk{n}", f"chunk{n}@example.com", "pw", is_student=True)
+            Enrollment.objects.create(student=student, course=course)
+
+        sent = []
+
+        def receiver(sender, student_ids, **kwargs):
+            sent.append(student_ids)
+
+        enrollments_approved.connect(receiver)
+        self.addCleanup(enrollments_approved.disconnect, receiver)
+
+        self.assertEqual(Enrollment.objects.all().approve(chunk_size=2), 3)
+        self.assertEqual([len(ids) for ids in sent], [2, 1])
+        self.assertEqual(Enrollment.objects.all().approve(chunk_size=2), 0)
+        self.assertEqual(len(sent), 2)
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class CourseSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(
+            "searcher", "searcher@example.com", "pw", is_student=True, is_authorized=True
+        )
+        cls.spanish = Course.objects.create(
+            title="Spanish for Beginners", short_description="Start speaking", description="Greetings and travel."
+        )
+        cls.travel = Course.objects.create(
+            title="Travel Writing", short_description="Essays", description="Write about Spanish towns."
+        )
+        cls.hidden = Course.objects.create(title="Spanish Drafts", short_description="", description="", is_published=False)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.student)
+
+    def search(self, q):
+        response = self.client.get(reverse("course_search"), {"q": q}, secure=True)
+        return [course["id"] for course in response.context["courses"]]
+
+    def test_ranks_title_matches_first_and_hides_unpublished(self):
+        self.assertEqual(self.search("spanish"), [self.spanish.pk, self.travel.pk])
+
+    def test_prefix_and_stemming(self):
+        self.assertEqual(self.search("spani"), [self.spanish.pk, self.travel.pk])
+        self.assertEqual(self.search("beginner"), [self.spanish.pk])
+
+    def test_index_follows_saves(self):
+        self.travel.title = "Travel Journalism"
+        self.travel.description = "Write about towns."
+        self.travel.save()
+        self.assertEqual(self.search("spanish"), [self.spanish.pk])
+        self.assertEqual(self.search("journalism"), [self.travel.pk])
+
+    def test_section_text_matches_after_course_fields(self):
+        section = CourseSection.objects.create(course=self.travel, title="Week 3", body="Conjugating verbs in Spanish")
+        self.assertEqual(self.search("conjugating"), [self.travel.pk])
+        self.assertEqual(self.search("spanish"), [self.spanish.pk, self.travel.pk])
+
+        section.body = "Interviews"
+        section.save()
+        self.assertEqual(self.search("conjugating"), [])
+        self.assertEqual(self.search("interview"), [self.travel.pk])
+        section.delete()
+        self.assertEqual(self.search("interview"), [])
+
+    def test_query_syntax_is_not_passed_through(self):
+        self.assertEqual(self.search('"spanish" OR ) NEAR('), [])
+        self.assertEqual(self.search("   "), [])
+
+    def test_admin_search_uses_the_index(self):
+        admin = User.objects.create_superuser("search-admin", "search-admin@example.com", "pw")
+        self.client.force_login(admin)
+        response = self.client.get(reverse("admin:courses_course_changelist"), {"q": "greetings"}, secure=True)
+        self.assertEqual([c.pk for c in response.context["cl"].result_list], [self.spanish.pk])
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class CourseSectionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(
+            "reader", "reader@example.com", "pw", is_student=True, is_authorized=True
+        )
+        cls.course = Course.objects.create(title="Long Course", short_description="", description="Old text")
+        cls.first = CourseSection.objects.create(course=cls.course, title="Intro", position=0, body="Hello <b>there</b>")
+        cls.second = CourseSection.objects.create(course=cls.course, title="Part 2", position=1, body="Second part")
+        Enrollment.objects.create(student=cls.student, course=cls.course, is_approved=True)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.student)
+
+    def test_rendered_on_save(self):
+        self.assertEqual(self.first.body_html, "<p>Hello &lt;b&gt;there&lt;/b&gt;</p>")
+        self.assertEqual(len(self.first.html_digest), 64)
+
+    def test_detail_ships_outline_and_first_section_only(self):
+        response = self.client.get(reverse("course_detail", args=[self.course.pk]), secure=True)
+        self.assertContains(response, "Hello &lt;b&gt;there&lt;/b&gt;")
+        self.assertContains(response, "Part 2")
+        self.assertNotContains(response, "Second part")
+        self.assertContains(response, reverse("course_section", args=[self.course.pk, self.second.pk]))
+
+    def test_outline_follows_section_edits(self):
+        self.client.get(reverse("course_detail", args=[self.course.pk]), secure=True)
+        self.first.body = "Rewritten"
+        self.first.save(update_fields=["body"])
+        response = self.client.get(reverse("course_detail", args=[self.course.pk]), secure=True)
+        self.assertContains(response, "<p>Rewritten</p>")
+
+    def test_section_endpoint_etag(self):
+        url = reverse("course_section", args=[self.course.pk, self.second.pk])
+        response = self.client.get(url, secure=True)
+        self.assertEqual(response.content, b"<p>Second part</p>")
+        etag = response["ETag"]
+
+        response = self.client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        self.second.body = "Changed"
+        self.second.save()
+        response = self.client.get(url, secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_section_requires_approval(self):
+        other = User.objects.create_user("other", "other@example.com", "pw", is_student=True, is_authorized=True)
+        self.client.force_login(other)
+        url = reverse("course_section", args=[self.course.pk, self.second.pk])
+        self.assertEqual(self.client.get(url, secure=True).status_code, 403)
+
+    def test_detail_access_follows_the_enrollment_row(self):
+        url = reverse("course_detail", args=[self.course.pk])
+        self.assertEqual(self.client.get(url, secure=True).status_code, 200)
+        # update() sends no signal: the cached state is stale, the row is not
+        Enrollment.objects.filter(student=self.student, course=self.course).update(is_approved=False)
+        self.assertEqual(self.client.get(url, secure=True).status_code, 403)
+
+    def test_admin_description_read_only_once_sections_exist(self):
+        self.client.force_login(User.objects.create_superuser("sections-admin", "sections-admin@example.com", "pw"))
+        response = self.client.get(reverse("admin:courses_course_change", args=[self.course.pk]), secure=True)
+        self.assertNotIn("description", response.context["adminform"].form.fields)
+
+        bare = Course.objects.create(title="No Sections", short_description="", description="Text")
+        response = self.client.get(reverse("admin:courses_course_change", args=[bare.pk]), secure=True)
+        self.assertIn("description", response.context["adminform"].form.fields)
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class PerWorkerCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(
+            "worker", "worker@example.com", "pw", is_student=True, is_authorized=True
+        )
+        cls.course = Course.objects.create(title="Per Worker", short_description="", description="")
+        cls.section = CourseSection.objects.create(course=cls.course, title="Intro", body="Text")
+        cls.enrollment = Enrollment.objects.create(student=cls.student, course=cls.course, is_approved=True)
+
+    def setUp(self):
+        # ✅ two gunicorn workers, each with its own LocMemCache
+        self.workers = [LocMemCache(f"worker-{n}", {}) for n in range(2)]
+        for worker in self.workers:
+            self.addCleanup(worker.clear)
+        self.client.force_login(self.student)
+        self.url = reverse("course_section", args=[self.course.pk, self.section.pk])
+
+    def get_on(self, worker):
+        with patch("courses.cache.cache", self.workers[worker]):
+            return self.client.get(self.url, secure=True)
+
+    def test_revocation_is_seen_by_every_worker(self):
+        self.assertEqual(self.get_on(0).status_code, 200)
+        with patch("courses.cache.cache", self.workers[1]):
+            self.enrollment.delete()
+        self.assertEqual(self.get_on(0).status_code, 403)
+
+    def test_local_state_is_short_lived(self):
+        with patch("courses.cache.cache", self.workers[0]), patch.object(self.workers[0], "set") as cache_set:
+            get_enrollment_state(self.student)
+        self.assertEqual(cache_set.call_args.args[2], LOCAL_ENROLLMENT_STATE_TIMEOUT)
+
+    def test_catalog_pages_expire_quickly(self):
+        with patch("courses.cache.cache", self.workers[0]):
+            before = get_catalog_page()
+        with patch("courses.cache.cache", self.workers[1]):
+            fresh = Course.objects.create(title="Fresh", short_description="", description="")
+        with patch("courses.cache.cache", self.workers[0]):
+            self.assertEqual(get_catalog_page(), before)
+            later = time.time() + LOCAL_CATALOG_TIMEOUT + 1
+            with patch("django.core.cache.backends.locmem.time.time", return_value=later):
+                self.assertEqual(get_catalog_page().courses[0]["id"], fresh.pk)
+
+    @override_settings(CACHE_IS_SHARED=True)
+    def test_shared_cache_answers_access_checks(self):
+        self.assertEqual(self.get_on(0).status_code, 200)
+        with patch("courses.cache.cache", self.workers[0]), self.assertNumQueries(0):
+            self.assertTrue(is_approved_for(self.student, self.course.pk))
+
+
+def event_data(chunk):
+    if isinstance(chunk, bytes):
+        chunk = chunk.decode()
+    return json.loads(chunk.split("data: ", 1)[1])
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class EnrollmentEventsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = User.objects.create_user(
+            "waiting", "waiting@example.com", "pw", is_student=True, is_authorized=True
+        )
+        cls.course = Course.objects.create(title="Awaited", short_description="", description="")
+        cls.enrollment = Enrollment.objects.create(student=cls.student, course=cls.course, is_approved=False)
+
+    def setUp(self):
+        cache.clear()
+
+    def approve(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.enrollment.approve()
+
+    async def test_broker_wakes_only_the_students_streams(self):
+        broker = LocalBroker()
+        async with broker.subscribe(1) as mine, broker.subscribe(2) as theirs:
+            self.assertEqual(broker.subscriber_count(), 2)
+            broker.publish([1, 1])
+            await asyncio.wait_for(mine.get(), 1)
+            self.assertTrue(theirs.empty())
+            self.assertTrue(mine.empty())
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    async def test_stream_pushes_approval(self):
+        stream = enrollment_event_stream(self.student.pk, timeout=5, keepalive=5)
+        first = await anext(stream)
+        self.assertIn("retry: ", first)
+        self.assertEqual(event_data(first), {"approved": [], "pending": [self.course.pk]})
+
+        await sync_to_async(self.approve)()
+        second = await asyncio.wait_for(anext(stream), 2)
+        self.assertEqual(event_data(second), {"approved": [self.course.pk], "pending": []})
+        await stream.aclose()
+        self.assertEqual(get_broker().subscriber_count(), 0)
+
+    async def test_stream_keepalive_and_timeout(self):
+        chunks = [chunk async for chunk in enrollment_event_stream(self.student.pk, timeout=0.3, keepalive=0.1)]
+        self.assertIn(": keepalive\n\n", chunks)
+        self.assertEqual(len([chunk for chunk in chunks if chunk.startswith("retry:")]), 1)
+
+    async def test_asgi_request_streams(self):
+        streams = []
+
+        def tracked_stream(*args, **kwargs):
+            streams.append(enrollment_event_stream(*args, **kwargs))
+            return streams[-1]
+
+        client = AsyncClient()
+        await client.aforce_login(self.student)
+        with patch("courses.views.enrollment_event_stream", tracked_stream):
+            response = await client.get(reverse("enrollment_events"), secure=True)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = aiter(response.streaming_content)
+        self.assertEqual(event_data(await anext(content))["pending"], [self.course.pk])
+
+        # ✅ close the stream itself (closing Django's wrapper leaves it suspended
+        # until the loop shuts down), so it unsubscribes while the loop still runs
+        await content.aclose()
+        await streams[0].aclose()
+        self.assertEqual(get_broker().subscriber_count(), 0)
+
+    def test_wsgi_request_gets_one_event(self):
+        self.client.force_login(self.student)
+        response = self.client.get(reverse("enrollment_events"), secure=True)
+        self.assertFalse(response.streaming)
+        self.assertTrue(response.content.startswith(b"retry: 30000\n"))
+
+    def test_non_students_are_refused(self):
+        self.client.force_login(User.objects.create_user("staffer", "staffer@example.com", "pw"))
+        self.assertEqual(self.client.get(reverse("enrollment_events"), secure=True).status_code, 403)
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class CsvExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser("export-admin", "export-admin@example.com", "pw")
+        cls.course = Course.objects.create(title="Exported", slug="exported", short_description="", description="")
+        cls.other = Course.objects.create(title="Other", slug="other", short_description="", description="")
+        cls.students = [
+            User.objects.create_user(f"exp{n}", f"exp{n}@example.com", "pw", is_student=True, is_authorized=n < 2)
+            for n in range(3)
+        ]
+        for n, student in enumerate(cls.students):
+            Enrollment.objects.create(student=student, course=cls.course, is_approved=n == 0)
+        Enrollment.objects.create(student=cls.students[0], course=cls.other, is_approved=True)
+
+    def export(self, *args, **options):
+        out = StringIO()
+        call_command("export_csv", *args, stdout=out, **options)
+        return list(csv.DictReader(StringIO(out.getvalue())))
+
+    def test_enrollments_filtered_by_course_and_status(self):
+        rows = self.export("enrollments", course="exported", status="pending", chunk_size=1)
+        self.assertEqual([row["username"] for row in rows], ["exp1", "exp2"])
+        self.assertEqual(rows[0]["course_slug"], "exported")
+        self.assertEqual(list(rows[0]), [header for header, _ in ENROLLMENT_COLUMNS])
+
+    def test_users_enrolled_in_course_and_date_filter(self):
+        rows = self.export("users", course="exported", status="verified")
+        self.assertEqual([row["username"] for row in rows], ["exp0", "exp1"])
+        self.assertEqual(self.export("users", since="2999-01-01"), [])
+
+    def test_chunks_hold_chunk_size_rows(self):
+        chunks = list(csv_chunks(Enrollment.objects.all(), ENROLLMENT_COLUMNS, chunk_size=2))
+        # header, then 4 rows in chunks of 2
+        self.assertEqual([chunk.count("\r\n") for chunk in chunks], [1, 2, 2])
+
+    def test_formulas_are_escaped(self):
+        User.objects.filter(pk=self.students[1].pk).update(first_name="=HYPERLINK(1)", last_name="-2+3")
+        Course.objects.filter(pk=self.course.pk).update(title="@SUM(A1)")
+        rows = {row["username"]: row for row in self.export("enrollments", course="exported")}
+        self.assertEqual(rows["exp1"]["first_name"], "'=HYPERLINK(1)")
+        self.assertEqual(rows["exp1"]["last_name"], "'-2+3")
+        self.assertEqual(rows["exp1"]["course_title"], "'@SUM(A1)")
+        self.assertEqual(rows["exp0"]["first_name"], "")
+
+    def test_admin_action_streams(self):
+        self.client.force_login(self.admin)
+        response = self.client.post(
+            reverse("admin:courses_enrollment_changelist"),
+            {
+                "action": "export_csv",
+                "select_across": "1",
+                "index": "0",
+                "_selected_action": [Enrollment.objects.first().pk],
+            },
+            secure=True,
+        )
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Disposition"], 'attachment; filename="enrollments.csv"')
+        body = b"".join(response.streaming_content).decode()
+        self.assertEqual(len(list(csv.DictReader(StringIO(body)))), 4)
+
+    async def test_asgi_response_iterates_asynchronously(self):
+        request = AsyncRequestFactory().get("/")
+        chunks = await sync_to_async(lambda: csv_chunks(Enrollment.objects.all(), ENROLLMENT_COLUMNS))()
+        response = streaming_csv_response(request, chunks, "enrollments.csv")
+        self.assertTrue(response.is_async)
+        body = "".join([chunk.decode() async for chunk in response])
+        self.assertEqual(body.count("\r\n"), 5)
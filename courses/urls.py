@@ -4,4 +4,11 @@ from . import views
 urlpatterns = [
     path("student/classes/", views.student_courses, name="student_courses"),
     path("student/classes/<int:pk>/", views.course_detail, name="course_detail"),
+    path(
+        "student/classes/<int:pk>/sections/<int:section_id>/",
+        views.course_section,
+        name="course_section",
+    ),
+    path("student/classes/search/", views.course_search, name="course_search"),
+    path("student/classes/events/", views.enrollment_events, name="enrollment_events"),
 ]
@@ -1,11 +1,17 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseForbidden
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, HttpResponseForbidden, HttpResponseNotModified, StreamingHttpResponse
 from django.utils import timezone
 
-from .models import Course, Enrollment
+from config.query_budget import query_budget
+from .cache import get_catalog_page, get_course_outline, get_course_summaries, get_enrollment_state, is_approved_for
+from .events import POLL_RETRY_MS, aget_enrollment_state, enrollment_event_stream, format_event
+from .models import Course, CourseSection, Enrollment
+from .search import search_courses
 
 
+@query_budget(5)
 @login_required
 def student_courses(request):
     # ✅ only students
@@ -16,36 +22,31 @@ def student_courses(request):
     if not getattr(request.user, "is_authorized", True):
         return HttpResponseForbidden("Not authorized.")
 
-    # ✅ courses this student can actually access (approved by admin)
-    approved_enrollments = (
-        Enrollment.objects.select_related("course")
-        .filter(student=request.user, is_approved=True)
-        .order_by("-approved_at", "-requested_at")
-    )
+    # ✅ which courses this student is approved for / has requested (cached)
+    state = get_enrollment_state(request.user)
 
-    # ✅ show student's approved courses
-    approved_courses = [e.course for e in approved_enrollments]
+    # ✅ OPTIONAL: show published courses (one cached page) so student can request access
+    catalog = get_catalog_page(cursor=request.GET.get("after"))
 
-    # ✅ OPTIONAL: show all published courses so student can request access
-    published_courses = Course.objects.filter(is_published=True).order_by("-created_at")
+    # ✅ show student's approved courses (most recently approved first)
+    approved_courses = get_course_summaries(state.approved)
 
     # ✅ which ones student already requested (pending)
-    pending_ids = set(
-        Enrollment.objects.filter(student=request.user, is_approved=False)
-        .values_list("course_id", flat=True)
-    )
+    pending_ids = state.pending
 
     return render(
         request,
         "courses/student_courses.html",
         {
             "approved_courses": approved_courses,
-            "published_courses": published_courses,
+            "published_courses": catalog.courses,
+            "next_cursor": catalog.next_cursor,
             "pending_ids": pending_ids,
         },
     )
 
 
+@query_budget(6)
 @login_required
 def request_course(request, pk):
     # ✅ only students
@@ -56,18 +57,21 @@ def request_course(request, pk):
     if not getattr(request.user, "is_authorized", True):
         return HttpResponseForbidden("Not authorized.")
 
-    course = get_object_or_404(Course, pk=pk, is_published=True)
+    # ✅ the course and this student's enrollment in one query
+    course = get_object_or_404(Course.objects.with_enrollment_state(request.user), pk=pk, is_published=True)
 
-    # ✅ create enrollment request (pending approval)
-    Enrollment.objects.get_or_create(
-        student=request.user,
-        course=course,
-        defaults={"is_approved": False},
-    )
+    # ✅ create enrollment request (pending approval), unless one already exists
+    if course.enrollment_state == "none":
+        Enrollment.objects.get_or_create(
+            student=request.user,
+            course=course,
+            defaults={"is_approved": False},
+        )
 
     return redirect("student_courses")
 
 
+@query_budget(6)
 @login_required
 def course_detail(request, pk):
     # ✅ only students
@@ -78,16 +82,120 @@ def course_detail(request, pk):
     if not getattr(request.user, "is_authorized", True):
         return HttpResponseForbidden("Not authorized.")
 
-    course = get_object_or_404(Course, pk=pk, is_published=True)
+    # ✅ description is only needed for courses without sections; the access
+    # check rides on the same query, so a revocation is seen at once
+    course = get_object_or_404(
+        Course.objects.defer("description").with_enrollment_state(request.user), pk=pk, is_published=True
+    )
 
     # ✅ student must be approved for this course
-    allowed = Enrollment.objects.filter(
-        student=request.user,
-        course=course,
-        is_approved=True
-    ).exists()
+    if course.enrollment_state != "approved":
+        return HttpResponseForbidden("You are not approved for this course yet.")
+
+    # ✅ outline + first section only; the others load from course_section
+    outline = get_course_outline(course.pk)
+
+    return render(
+        request,
+        "courses/course_detail.html",
+        {"course": course, "sections": outline.sections, "first_html": outline.first_html},
+    )
+
+
+@query_budget(5)
+@login_required
+def course_section(request, pk, section_id):
+    # ✅ only students
+    if not getattr(request.user, "is_student", False):
+        return HttpResponseForbidden("Students only.")
+
+    # ✅ must be verified/authorized to use platform
+    if not getattr(request.user, "is_authorized", True):
+        return HttpResponseForbidden("Not authorized.")
 
-    if not allowed:
+    # ✅ student must be approved for this course
+    if not is_approved_for(request.user, pk):
         return HttpResponseForbidden("You are not approved for this course yet.")
 
-    return render(request, "courses/course_detail.html", {"course": course})
+    section = CourseSection.objects.filter(pk=section_id, course_id=pk, course__is_published=True)
+
+    # ✅ revalidation: compare digests without loading the HTML
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        digest = section.values_list("html_digest", flat=True).first()
+        if digest is None:
+            raise Http404
+        if if_none_match == f'"{digest}"':
+            response = HttpResponseNotModified()
+            response["ETag"] = if_none_match
+            response["Cache-Control"] = "private, no-cache"
+            return response
+
+    row = section.values_list("body_html", "html_digest").first()
+    if row is None:
+        raise Http404
+
+    response = HttpResponse(row[0])
+    response["ETag"] = f'"{row[1]}"'
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+@query_budget(5)
+@login_required
+def course_search(request):
+    # ✅ only students
+    if not getattr(request.user, "is_student", False):
+        return HttpResponseForbidden("Students only.")
+
+    # ✅ must be verified/authorized to use platform
+    if not getattr(request.user, "is_authorized", True):
+        return HttpResponseForbidden("Not authorized.")
+
+    query = request.GET.get("q", "").strip()
+    try:
+        page = int(request.GET.get("page", 1))
+    except ValueError:
+        page = 1
+
+    # ✅ ranked, paginated matches (full-text index, cached per catalog version)
+    results = search_courses(query, page=page)
+
+    return render(
+        request,
+        "courses/course_search.html",
+        {
+            "query": query,
+            "courses": results.courses,
+            "page": results.page,
+            "has_next": results.has_next,
+            "pending_ids": get_enrollment_state(request.user).pending,
+        },
+    )
+
+
+@query_budget(3)
+@login_required
+async def enrollment_events(request):
+    user = await request.auser()
+
+    # ✅ only students
+    if not getattr(user, "is_student", False):
+        return HttpResponseForbidden("Students only.")
+
+    # ✅ must be verified/authorized to use platform
+    if not getattr(user, "is_authorized", True):
+        return HttpResponseForbidden("Not authorized.")
+
+    if isinstance(request, ASGIRequest):
+        # ✅ held open: an idle stream is a coroutine waiting on a queue
+        response = StreamingHttpResponse(enrollment_event_stream(user.pk), content_type="text/event-stream")
+    else:
+        # ✅ under WSGI a stream would pin a worker: send the state, let EventSource poll
+        state = await aget_enrollment_state(user.pk)
+        response = HttpResponse(format_event(state, retry=POLL_RETRY_MS), content_type="text/event-stream")
+
+    response["Cache-Control"] = "no-cache"
+    # nginx-style proxies must not buffer the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -0,0 +1,15 @@
+# Picked up automatically by `gunicorn config.wsgi` from the project root.
+import os
+
+preload_app = os.getenv("GUNICORN_PRELOAD", "False").lower() == "true"
+
+
+def post_worker_init(worker):
+    # the app (and Django) is loaded at this point, but no request has been served yet
+    from config.warmup import warm_up
+
+    report = warm_up()
+    worker.log.info(
+        "warmup: %s",
+        ", ".join(f"{step}={count} ({seconds * 1000:.0f}ms)" for step, (count, seconds) in report.items()),
+    )
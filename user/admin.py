@@ -1,3 +1,13 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ("to_email", "subject", "status", "attempts", "created_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("to_email",)
+    readonly_fields = ("created_at", "sent_at", "claimed_at", "last_error")
+    # ✅ a pending verification email's body holds the plaintext code
+    exclude = ("body",)
@@ -0,0 +1,174 @@
+"""
+Async versions of the login / signup / verify views, for serving under
+ASGI (see README). Enabled with ASYNC_AUTH_VIEWS=true.
+
+PBKDF2 (authenticate, form.save) runs in a small dedicated thread pool so a
+burst of signups can't occupy the event loop or Django's single
+thread-sensitive executor; everything else awaits the ORM/session directly.
+"""
+import asyncio
+import functools
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import alogin, authenticate, get_user_model
+from django.db import close_old_connections
+from django.shortcuts import render, redirect
+
+from config.query_budget import query_budget
+
+from .forms import StudentSignUpForm, VerifyCodeForm
+from .page_cache import anonymous_page_cache
+from .throttling import throttle
+from .views import save_with_verification_email
+
+User = get_user_model()
+
+_hash_pool = ThreadPoolExecutor(
+    max_workers=getattr(settings, "PASSWORD_HASH_THREADS", 4),
+    thread_name_prefix="password-hash",
+)
+
+arender = sync_to_async(render)
+
+
+def _in_pool(func, *args, **kwargs):
+    # pool threads live outside the request cycle, so recycle stale connections here
+    close_old_connections()
+    return func(*args, **kwargs)
+
+
+async def run_hashing(func, *args, **kwargs):
+    """Run a password-hashing call in the bounded hash pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_pool, functools.partial(_in_pool, func, *args, **kwargs))
+
+
+@query_budget(9)
+@anonymous_page_cache
+@throttle("student_login", methods=("POST",), per_field="username")
+async def student_login(request):
+    error = None
+
+    if request.method == "POST":
+        username = request.POST.get("username", "").strip()
+        password = request.POST.get("password", "")
+
+        user = await run_hashing(authenticate, request, username=username, password=password)
+
+        if user is None:
+            error = "Invalid username or password."
+        else:
+            if user.is_superuser or user.is_staff:
+                user.is_authorized = True
+                await user.asave(update_fields=["is_authorized"])
+                await alogin(request, user)
+                return redirect("/admin/")
+
+            if user.is_student and not user.is_authorized:
+                await request.session.aset("pending_user_id", user.id)
+                return redirect("student_verify")
+
+            await alogin(request, user)
+            return redirect("student_dashboard")
+
+    return await arender(request, "accounts/student_login.html", {"error": error})
+
+
+@query_budget(10)
+@anonymous_page_cache
+async def student_signup(request):
+    if (await request.auser()).is_authenticated:
+        return redirect("student_dashboard")
+
+    form = StudentSignUpForm(request.POST or None)
+
+    if request.method == "POST" and await sync_to_async(form.is_valid)():
+        # ✅ form.save(commit=False) hashes password1
+        user = await run_hashing(form.save, commit=False)
+
+        user.first_name = form.cleaned_data["first_name"].strip()
+        user.middle_name = form.cleaned_data.get("middle_name", "").strip()
+        user.last_name = form.cleaned_data["last_name"].strip()
+        user.email = form.cleaned_data["email"].strip().lower()
+
+        user.is_student = True
+        user.is_authorized = False
+
+        code = f"{secrets.randbelow(10**6):06d}"
+
+        await sync_to_async(save_with_verification_email)(
+            user,
+            code,
+            subject="Welcome to Vantage Lingua Hub – Verify Your Account",
+        )
+
+        await request.session.aset("pending_user_id", user.id)
+        return redirect("student_verify")
+
+    return await arender(request, "accounts/student_signup.html", {"form": form})
+
+
+@query_budget(13)
+@throttle("student_verify", methods=("POST",))
+async def student_verify(request):
+    user_id = await request.session.aget("pending_user_id")
+    if not user_id:
+        return redirect("student_login")
+
+    user = await User.objects.filter(id=user_id).afirst()
+    if not user:
+        return redirect("student_login")
+
+    form = VerifyCodeForm(request.POST or None)
+    error = None
+
+    if request.method == "POST" and form.is_valid():
+        code = form.cleaned_data["code"]
+
+        if user.check_verification_code(code):
+            user.is_authorized = True
+            user.verification_code_hash = ""
+            user.verification_code_expires_at = None
+            await user.asave()
+
+            await alogin(request, user)
+            await request.session.apop("pending_user_id", None)
+            return redirect("student_dashboard")
+
+        error = "Invalid or expired code."
+
+    return await arender(
+        request,
+        "accounts/student_verify.html",
+        {
+            "form": form,
+            "error": error,
+            "email": user.email,
+        },
+    )
+
+
+@query_budget(9)
+@throttle("resend_code")
+async def resend_code(request):
+    user_id = await request.session.aget("pending_user_id")
+    if not user_id:
+        return redirect("student_login")
+
+    user = await User.objects.filter(id=user_id).afirst()
+    if not user:
+        return redirect("student_login")
+
+    code = f"{secrets.randbelow(10**6):06d}"
+
+    await sync_to_async(save_with_verification_email)(
+        user,
+        code,
+        subject="Vantage Lingua Hub – Your New Verification Code",
+        update_fields=["verification_code_hash", "verification_code_expires_at"],
+    )
+
+    return redirect("student_verify")
@@ -0,0 +1,230 @@
+import json
+import statistics
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from courses.management.commands.seed_scale import SEED_PASSWORD, SEED_PREFIX
+from courses.models import Course, Enrollment
+from courses.views import request_course
+
+User = get_user_model()
+
+# ✅ bench the views, not the rate limiter (its bookkeeping still runs)
+UNTHROTTLED = {
+    "student_login": (10**9, 1),
+    "student_login_ip": (10**9, 1),
+    "student_verify": (10**9, 1),
+    "resend_code": (10**9, 1),
+}
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    return ordered[max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))]
+
+
+class Bench:
+    """Fixtures (seeded students/courses) and one callable per scenario."""
+
+    def __init__(self, prefix):
+        self.secure = getattr(settings, "SECURE_SSL_REDIRECT", False)
+
+        enrollment = (
+            Enrollment.objects.filter(
+                student__username__startswith=f"{prefix}-student-",
+                is_approved=True,
+                course__is_published=True,
+            )
+            .select_related("student")
+            .order_by("pk")
+            .first()
+        )
+        if enrollment is None:
+            raise CommandError("No seeded data: run `manage.py seed_scale` first.")
+
+        self.student = enrollment.student
+        self.course_id = enrollment.course_id
+        requested = Enrollment.objects.filter(student=self.student).values_list("course_id", flat=True)
+        self.requestable = list(
+            Course.objects.published().exclude(pk__in=requested).values_list("pk", flat=True)[:1000]
+        )
+        self.requested = []
+
+        self.verifying, _ = User.objects.get_or_create(
+            username=f"{prefix}-bench-verify",
+            defaults={"email": f"{prefix}-bench-verify@example.com", "is_student": True},
+        )
+        self.admin, _ = User.objects.get_or_create(
+            username=f"{prefix}-bench-admin",
+            defaults={"email": f"{prefix}-bench-admin@example.com", "is_staff": True, "is_superuser": True},
+        )
+
+        self.student_client = Client()
+        self.student_client.force_login(self.student)
+        self.admin_client = Client()
+        self.admin_client.force_login(self.admin)
+        self.factory = RequestFactory()
+
+    def get(self, client, url):
+        return client.get(url, secure=self.secure)
+
+    # (setup, timed call) per scenario; setup runs outside the timing
+    def scenarios(self):
+        return {
+            "student_courses": (None, lambda: self.get(self.student_client, reverse("student_courses"))),
+            "course_detail": (
+                None,
+                lambda: self.get(self.student_client, reverse("course_detail", args=[self.course_id])),
+            ),
+            "request_course": (self.next_requestable, self.request_course),
+            "student_login": (None, self.student_login),
+            "student_verify": (self.prepare_verify, self.student_verify),
+            "admin_courses": (None, lambda: self.get(self.admin_client, reverse("admin:courses_course_changelist"))),
+            "admin_enrollments": (
+                None,
+                lambda: self.get(self.admin_client, reverse("admin:courses_enrollment_changelist")),
+            ),
+            "admin_users": (
+                None,
+                lambda: self.get(self.admin_client, reverse("admin:accounts_customuser_changelist")),
+            ),
+        }
+
+    def next_requestable(self):
+        if not self.requestable:
+            raise CommandError("Student has requested every course; reseed or lower --iterations.")
+        self.requested.append(self.requestable.pop())
+
+    def request_course(self):
+        # not routed in urls.py: called directly, without the middleware stack
+        request = self.factory.post("/", secure=self.secure)
+        request.user = self.student
+        return request_course(request, self.requested[-1])
+
+    def student_login(self):
+        return Client().post(
+            reverse("student_login"),
+            {"username": self.student.username, "password": SEED_PASSWORD},
+            secure=self.secure,
+        )
+
+    def prepare_verify(self):
+        self.verifying.is_authorized = False
+        self.verifying.set_verification_code("123456")
+        self.verifying.save()
+        self.verify_client = Client()
+        session = self.verify_client.session
+        session["pending_user_id"] = self.verifying.pk
+        session.save()
+
+    def student_verify(self):
+        return self.verify_client.post(reverse("student_verify"), {"code": "123456"}, secure=self.secure)
+
+    def cleanup(self):
+        Enrollment.objects.filter(student=self.student, course_id__in=self.requested).delete()
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the hot paths against the seeded dataset (manage.py seed_scale): "
+        "p50/p95/p99 latency and query counts, optionally compared with a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=50)
+        parser.add_argument("--warmup", type=int, default=3, help="Untimed runs per scenario")
+        parser.add_argument("--only", nargs="+", metavar="SCENARIO", help="Run only these scenarios")
+        parser.add_argument("--prefix", default=SEED_PREFIX, help="seed_scale --prefix of the dataset")
+        parser.add_argument("--save-baseline", metavar="PATH", help="Write the results as a baseline JSON")
+        parser.add_argument("--baseline", metavar="PATH", help="Compare against a baseline JSON")
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Allowed p95 slowdown vs. the baseline before flagging (0.2 = 20%%)",
+        )
+
+    def handle(self, *args, **options):
+        with override_settings(THROTTLE_RATES=UNTHROTTLED):
+            results = self.run(options)
+
+        self.report(results)
+
+        if options["save_baseline"]:
+            Path(options["save_baseline"]).write_text(json.dumps(results, indent=2) + "\n")
+            self.stdout.write(f"Baseline written to {options['save_baseline']}")
+
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text())
+            regressions = self.compare(results, baseline, options["tolerance"])
+            if regressions:
+                for line in regressions:
+                    self.stdout.write(self.style.ERROR(line))
+                raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}")
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
+
+    def run(self, options):
+        bench = Bench(options["prefix"])
+        scenarios = bench.scenarios()
+        selected = options["only"] or list(scenarios)
+        unknown = set(selected) - set(scenarios)
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}. Choose from {', '.join(scenarios)}")
+
+        results = {}
+        try:
+            for name in selected:
+                setup, call = scenarios[name]
+                timings, queries = [], []
+                for i in range(options["warmup"] + options["iterations"]):
+                    if setup:
+                        setup()
+                    with CaptureQueriesContext(connection) as captured:
+                        started = time.perf_counter()
+                        response = call()
+                        elapsed = time.perf_counter() - started
+                    if response.status_code >= 400:
+                        raise CommandError(f"{name}: HTTP {response.status_code}")
+                    if i >= options["warmup"]:
+                        timings.append(elapsed * 1000)
+                        queries.append(len(captured))
+
+                results[name] = {
+                    "p50_ms": round(percentile(timings, 50), 2),
+                    "p95_ms": round(percentile(timings, 95), 2),
+                    "p99_ms": round(percentile(timings, 99), 2),
+                    "queries_median": statistics.median(queries),
+                    "queries_max": max(queries),
+                }
+        finally:
+            bench.cleanup()
+        return results
+
+    def report(self, results):
+        self.stdout.write(f"{'scenario':<20}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'queries':>10}{'max':>6}")
+        for name, r in results.items():
+            self.stdout.write(
+                f"{name:<20}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+                f"{r['queries_median']:>10g}{r['queries_max']:>6}"
+            )
+
+    def compare(self, results, baseline, tolerance):
+        regressions = []
+        for name, r in results.items():
+            base = baseline.get(name)
+            if base is None:
+                continue
+            if r["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{name}: p95 {r['p95_ms']:.2f} ms vs. baseline {base['p95_ms']:.2f} ms")
+            if r["queries_max"] > base["queries_max"]:
+                regressions.append(f"{name}: {r['queries_max']} queries vs. baseline {base['queries_max']}")
+        return regressions
@@ -0,0 +1,82 @@
+import json
+import re
+from pathlib import Path
+
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+PAGES = {
+    "home": ("home.html", {}),
+    "student_login": ("accounts/student_login.html", {}),
+    "student_signup": ("accounts/student_signup.html", {}),
+    "student_dashboard": ("accounts/student_dashboard.html", {"selected_course": ""}),
+}
+
+STYLE_RE = re.compile(r"<style[^>]*>.*?</style>", re.S)
+STYLESHEET_RE = re.compile(r'<link rel="stylesheet" href="/static/([^"]+)"')
+
+
+class Command(BaseCommand):
+    help = (
+        "Per-page HTML weight: bytes still inlined in <style> vs. bytes served "
+        "from cacheable static stylesheets (i.e. saved on every repeat view), "
+        "optionally compared with a saved baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--save-baseline", metavar="PATH", help="Write the weights as a baseline JSON")
+        parser.add_argument("--baseline", metavar="PATH", help="Show the savings against a baseline JSON")
+
+    def handle(self, *args, **options):
+        results = self.measure()
+
+        baseline = {}
+        if options["baseline"]:
+            try:
+                baseline = json.loads(Path(options["baseline"]).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Cannot read baseline {options['baseline']}: {exc}")
+
+        header = f"{'page':<20}{'html':>10}{'inline css':>12}{'linked css':>12}{'saved/view':>12}"
+        if baseline:
+            header += f"{'html before':>13}{'html saved':>12}"
+        self.stdout.write(header)
+
+        for page, r in results.items():
+            saved = f"{r['linked'] / (r['html'] + r['linked']):.0%}" if r["linked"] else "-"
+            line = f"{page:<20}{r['html']:>10}{r['inline']:>12}{r['linked']:>12}{saved:>12}"
+            if baseline:
+                before = baseline.get(page, {}).get("html")
+                if before:
+                    line += f"{before:>13}{before - r['html']:>+12}"
+                else:
+                    line += f"{'-':>13}{'-':>12}"
+            self.stdout.write(line)
+
+        if options["save_baseline"]:
+            Path(options["save_baseline"]).write_text(json.dumps(results, indent=2) + "\n")
+            self.stdout.write(f"Baseline written to {options['save_baseline']}")
+
+    def measure(self):
+        """{page: {"html": bytes, "inline": bytes, "linked": bytes}} for every page in PAGES."""
+        request = RequestFactory().get("/")
+        request.user = AnonymousUser()
+
+        results = {}
+        for page, (template_name, context) in PAGES.items():
+            html = render_to_string(template_name, context, request=request).encode()
+            inline = sum(len(m.encode()) for m in STYLE_RE.findall(html.decode()))
+
+            linked = 0
+            for name in STYLESHEET_RE.findall(html.decode()):
+                # strip the manifest hash if collectstatic has run
+                path = finders.find(re.sub(r"\.[0-9a-f]{12}(\.css)$", r"\1", name))
+                if path:
+                    with open(path, "rb") as f:
+                        linked += len(f.read())
+
+            results[page] = {"html": len(html), "inline": inline, "linked": linked}
+        return results
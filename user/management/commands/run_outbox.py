@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from user.outbox import get_transport, process_batch, purge_finished
+
+# how often an idle worker sweeps out old sent/failed rows
+PURGE_INTERVAL = 60 * 60
+
+
+class Command(BaseCommand):
+    help = "Deliver queued outbound emails (verification codes, etc.)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument("--sleep", type=float, default=2.0, help="Seconds to wait when the outbox is empty")
+        parser.add_argument("--once", action="store_true", help="Drain the outbox once and exit")
+
+    def handle(self, *args, **options):
+        transport = get_transport()
+        self.stdout.write(f"Outbox worker started ({type(transport).__name__}).")
+        last_purge = None
+
+        while True:
+            sent, failed = process_batch(options["batch_size"], transport=transport)
+            if sent or failed:
+                self.stdout.write(f"sent={sent} failed={failed}")
+                continue
+
+            if last_purge is None or time.monotonic() - last_purge >= PURGE_INTERVAL:
+                purged = purge_finished()
+                if purged:
+                    self.stdout.write(f"purged={purged}")
+                last_purge = time.monotonic()
+
+            if options["once"]:
+                break
+            time.sleep(options["sleep"])
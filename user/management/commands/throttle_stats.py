@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from user.throttling import throttle_counters
+
+
+class Command(BaseCommand):
+    help = "Show allowed/throttled request counters per throttled endpoint."
+
+    def handle(self, *args, **options):
+        for endpoint, counts in throttle_counters().items():
+            self.stdout.write(f"{endpoint}: allowed={counts['allowed']} throttled={counts['throttled']}")
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand
+
+from config.warmup import warm_up
+
+IMPORT_PROFILE_SCRIPT = (
+    "import django; django.setup(); "
+    "import config.wsgi; "
+    "from django.urls import get_resolver; get_resolver().url_patterns"
+)
+
+
+class Command(BaseCommand):
+    help = "Precompile templates, populate URL resolvers and ping databases (worker warm-up)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--profile-imports",
+            action="store_true",
+            help="Also report the slowest imports of a cold app boot (python -X importtime)",
+        )
+        parser.add_argument("--top", type=int, default=20, help="Rows in the import profile")
+
+    def handle(self, *args, **options):
+        for step, (count, seconds) in warm_up().items():
+            self.stdout.write(f"{step:<10} {count:>5}  {seconds * 1000:8.1f} ms")
+
+        if options["profile_imports"]:
+            self.profile_imports(options["top"])
+
+    def profile_imports(self, top):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", IMPORT_PROFILE_SCRIPT],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "config.settings")},
+        )
+
+        rows = []
+        for line in result.stderr.splitlines():
+            # "import time:  self [us] | cumulative | imported package"
+            if not line.startswith("import time:") or "imported package" in line:
+                continue
+            _, self_us, cumulative_us, module = (part.strip() for part in line.replace("import time:", "|", 1).split("|"))
+            rows.append((int(cumulative_us), int(self_us), module))
+
+        self.stdout.write("\nSlowest imports (cold boot, cumulative):")
+        for cumulative_us, self_us, module in sorted(rows, reverse=True)[:top]:
+            self.stdout.write(f"{cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:6.1f} ms)  {module}")
@@ -0,0 +1,194 @@
+import logging
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = getattr(settings, "EMAIL_OUTBOX_MAX_ATTEMPTS", 6)
+BACKOFF_SECONDS = getattr(settings, "EMAIL_OUTBOX_BACKOFF_SECONDS", 30)
+MAX_BACKOFF_SECONDS = 60 * 60
+# a row stuck in "sending" this long belonged to a worker that died
+CLAIM_LEASE = timedelta(minutes=5)
+# sent/failed rows are deleted this long after they were created
+RETENTION = timedelta(days=getattr(settings, "EMAIL_OUTBOX_RETENTION_DAYS", 7))
+
+
+# ----------------------------
+# Queueing
+# ----------------------------
+def enqueue_email(to_email, subject, body, user=None):
+    """
+    Queue an email for the outbox worker. Call it inside the same
+    transaction as the change it belongs to, so both commit or neither does.
+    """
+    return OutboundEmail.objects.create(
+        user=user,
+        to_email=to_email,
+        subject=subject,
+        body=body,
+    )
+
+
+# ----------------------------
+# Transports
+# ----------------------------
+class SendGridTransport:
+    def __init__(self):
+        if not settings.SENDGRID_API_KEY:
+            raise ValueError("SENDGRID_API_KEY not set")
+        if not settings.DEFAULT_FROM_EMAIL:
+            raise ValueError("DEFAULT_FROM_EMAIL not set")
+
+        from sendgrid import SendGridAPIClient
+
+        self.client = SendGridAPIClient(settings.SENDGRID_API_KEY)
+
+    def send(self, email):
+        from sendgrid.helpers.mail import Mail
+
+        mail = Mail(
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            to_emails=email.to_email,
+            subject=email.subject,
+            plain_text_content=email.body,
+        )
+        self.client.send(mail)
+
+
+class ConsoleTransport:
+    """Local stand-in: logs the message instead of sending it."""
+
+    def send(self, email):
+        logger.info("EMAIL to %s: %s\n%s", email.to_email, email.subject, email.body)
+
+
+class FileTransport:
+    """Local stand-in: writes one .eml-ish file per message to EMAIL_FILE_PATH."""
+
+    def __init__(self):
+        self.path = Path(getattr(settings, "EMAIL_FILE_PATH", settings.BASE_DIR / "sent_emails"))
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def send(self, email):
+        target = self.path / f"{email.pk:08d}-{email.attempts}.txt"
+        target.write_text(f"To: {email.to_email}\nSubject: {email.subject}\n\n{email.body}\n")
+
+
+class LocmemTransport:
+    """Test stand-in: collects messages in LocmemTransport.outbox."""
+
+    outbox = []
+
+    def send(self, email):
+        self.outbox.append(email)
+
+
+def get_transport():
+    return import_string(settings.EMAIL_OUTBOX_TRANSPORT)()
+
+
+# ----------------------------
+# Worker
+# ----------------------------
+def _due(now):
+    return Q(status=OutboundEmail.STATUS_PENDING, next_attempt_at__lte=now) | Q(
+        status=OutboundEmail.STATUS_SENDING, claimed_at__lt=now - CLAIM_LEASE
+    )
+
+
+def claim_batch(batch_size):
+    """
+    Mark up to ``batch_size`` due rows as "sending" and return them.
+    Uses SELECT ... FOR UPDATE SKIP LOCKED where the database supports it,
+    so several workers never pick the same row; otherwise (SQLite) each row
+    is claimed with a compare-and-set UPDATE.
+    """
+    now = timezone.now()
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(
+                OutboundEmail.objects.select_for_update(skip_locked=True)
+                .filter(_due(now))
+                .order_by("next_attempt_at")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            OutboundEmail.objects.filter(pk__in=ids).update(
+                status=OutboundEmail.STATUS_SENDING, claimed_at=now
+            )
+    else:
+        candidates = list(
+            OutboundEmail.objects.filter(_due(now))
+            .order_by("next_attempt_at")
+            .values_list("pk", "status", "claimed_at")[:batch_size]
+        )
+        ids = [
+            pk
+            for pk, status, claimed_at in candidates
+            if OutboundEmail.objects.filter(pk=pk, status=status, claimed_at=claimed_at).update(
+                status=OutboundEmail.STATUS_SENDING, claimed_at=now
+            )
+        ]
+
+    return list(OutboundEmail.objects.filter(pk__in=ids).order_by("next_attempt_at"))
+
+
+def _backoff(attempts):
+    return timedelta(seconds=min(BACKOFF_SECONDS * 2 ** (attempts - 1), MAX_BACKOFF_SECONDS))
+
+
+def deliver(email, transport):
+    email.attempts += 1
+    try:
+        transport.send(email)
+    except Exception as e:
+        logger.exception("Outbox send failed for #%s: %s", email.pk, e)
+        email.last_error = f"{type(e).__name__}: {e}"
+        if email.attempts >= MAX_ATTEMPTS:
+            email.status = OutboundEmail.STATUS_FAILED
+        else:
+            email.status = OutboundEmail.STATUS_PENDING
+            email.next_attempt_at = timezone.now() + _backoff(email.attempts)
+    else:
+        email.status = OutboundEmail.STATUS_SENT
+        email.sent_at = timezone.now()
+        email.last_error = ""
+
+    email.claimed_at = None
+    update_fields = ["attempts", "status", "next_attempt_at", "claimed_at", "last_error", "sent_at"]
+    if email.status in (OutboundEmail.STATUS_SENT, OutboundEmail.STATUS_FAILED):
+        # ✅ done with it: don't keep verification codes around in plaintext
+        email.body = ""
+        update_fields.append("body")
+    email.save(update_fields=update_fields)
+    return email.status == OutboundEmail.STATUS_SENT
+
+
+def process_batch(batch_size=50, transport=None):
+    """Claim and deliver one batch. Returns (sent, failed) counts."""
+    transport = transport or get_transport()
+
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    sent = sum(deliver(email, transport) for email in batch)
+    return sent, len(batch) - sent
+
+
+def purge_finished(now=None):
+    """Delete sent/failed rows older than EMAIL_OUTBOX_RETENTION_DAYS. Returns the count."""
+    now = now or timezone.now()
+    deleted, _ = OutboundEmail.objects.filter(
+        status__in=(OutboundEmail.STATUS_SENT, OutboundEmail.STATUS_FAILED),
+        created_at__lt=now - RETENTION,
+    ).delete()
+    return deleted
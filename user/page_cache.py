@@ -0,0 +1,124 @@
+"""
+Full-page cache for anonymous GETs of the mostly-static pages (home, login,
+signup), with strong ETags and If-None-Match -> 304 before the view runs.
+
+CSRF: the masked token in a cached page is swapped for a placeholder and
+re-filled per request from the visitor's own CSRF cookie. The ETag of such
+a page includes that cookie's secret, so a browser only gets a 304 for a
+copy whose token still matches its cookie.
+"""
+import functools
+import hashlib
+import re
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse, HttpResponseNotModified
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_vary_headers
+
+PAGE_CACHE_TIMEOUT = getattr(settings, "PAGE_CACHE_TIMEOUT", 5 * 60)
+CSRF_PLACEHOLDER = "__CSRF_TOKEN__"
+CSRF_INPUT_RE = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+
+def _page_key(request):
+    version = getattr(settings, "PAGE_CACHE_VERSION", "")
+    return f"pagecache:{version}:{hashlib.sha256(request.path.encode()).hexdigest()}"
+
+
+def _is_cacheable_request(request):
+    if request.method not in ("GET", "HEAD"):
+        return False
+    # ✅ the cached pages read no query params: one entry per path, so
+    # ?anything=N can't be used to fill the cache
+    if request.META.get("QUERY_STRING"):
+        return False
+    # ✅ no session cookie -> certainly anonymous, without loading a session
+    if settings.SESSION_COOKIE_NAME not in request.COOKIES:
+        return True
+    return not request.user.is_authenticated
+
+
+def _etag(page, request):
+    seed = page["digest"]
+    if page["has_csrf"]:
+        seed += request.META.get("CSRF_COOKIE", "")
+    return f'"{hashlib.sha256(seed.encode()).hexdigest()[:32]}"'
+
+
+def _finish(response, page, request):
+    response["ETag"] = _etag(page, request)
+    if page["has_csrf"]:
+        # ✅ personalised by the CSRF cookie: browser may keep it, shared caches may not
+        response["Cache-Control"] = "private, no-cache"
+    else:
+        response["Cache-Control"] = f"public, max-age={PAGE_CACHE_TIMEOUT}"
+    # the anonymous copy: a proxy must not hand it to a logged-in visitor
+    patch_vary_headers(response, ("Cookie",))
+    return response
+
+
+def serve_cached(request):
+    """A response from the page cache (200 or 304), or None on a miss."""
+    if not _is_cacheable_request(request):
+        return None
+
+    page = cache.get(_page_key(request))
+    if page is None:
+        return None
+
+    # a page without a CSRF cookie yet can't be revalidated: it needs the cookie set
+    can_revalidate = not page["has_csrf"] or "CSRF_COOKIE" in request.META
+    if can_revalidate and request.headers.get("If-None-Match") == _etag(page, request):
+        return _finish(HttpResponseNotModified(), page, request)
+
+    body = page["body"]
+    if page["has_csrf"]:
+        body = body.replace(CSRF_PLACEHOLDER, get_token(request))
+
+    response = HttpResponse(body, content_type=page["content_type"])
+    return _finish(response, page, request)
+
+
+def store(request, response):
+    if not _is_cacheable_request(request):
+        return response
+    if response.status_code != 200 or response.streaming or response.cookies.get(settings.SESSION_COOKIE_NAME):
+        return response
+
+    body, csrf_fields = CSRF_INPUT_RE.subn(rf"\g<1>{CSRF_PLACEHOLDER}\g<2>", response.content.decode(response.charset))
+    page = {
+        "body": body,
+        "content_type": response["Content-Type"],
+        "has_csrf": bool(csrf_fields),
+        "digest": hashlib.sha256(body.encode()).hexdigest(),
+    }
+    cache.set(_page_key(request), page, PAGE_CACHE_TIMEOUT)
+    return _finish(response, page, request)
+
+
+def anonymous_page_cache(view):
+    """Cache an anonymous-GET page; authenticated users and POSTs go straight to the view."""
+    if iscoroutinefunction(view):
+
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            cached = await sync_to_async(serve_cached)(request)
+            if cached is not None:
+                return cached
+            response = await view(request, *args, **kwargs)
+            return await sync_to_async(store)(request, response)
+
+    else:
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            cached = serve_cached(request)
+            if cached is not None:
+                return cached
+            return store(request, view(request, *args, **kwargs))
+
+    return wrapper
@@ -0,0 +1,106 @@
+import json
+from functools import lru_cache
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from config.storage import RESPONSIVE_IMAGES_MANIFEST
+
+register = template.Library()
+
+
+@lru_cache(maxsize=1)
+def _collected_metadata():
+    try:
+        with staticfiles_storage.open(RESPONSIVE_IMAGES_MANIFEST) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+@lru_cache(maxsize=64)
+def _source_size(name):
+    # not collected (runserver): no variants, but still give the <img> its dimensions
+    path = finders.find(name)
+    if not path:
+        return None
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    with Image.open(path) as image:
+        return image.size
+
+
+def image_metadata(name):
+    entry = _collected_metadata().get(name)
+    if entry:
+        return entry
+    size = _source_size(name)
+    if size:
+        return {"width": size[0], "height": size[1], "variants": []}
+    return None
+
+
+def _srcset(variants, key):
+    return ", ".join(f"{static(v[key])} {v['width']}w" for v in variants)
+
+
+@register.simple_tag
+def responsive_image(name, alt="", sizes="100vw", loading="lazy", css_class=""):
+    """
+    <picture> with a WebP srcset, the original-format srcset as fallback,
+    and explicit width/height so the browser reserves the space.
+
+        {% responsive_image "images/homepage1.png" alt="..." sizes="(max-width: 700px) 100vw, 420px" %}
+    """
+    meta = image_metadata(name) or {}
+    variants = meta.get("variants", [])
+
+    attrs = [
+        ("src", static(name)),
+        ("alt", alt),
+        ("loading", loading),
+        ("decoding", "async"),
+    ]
+    if meta:
+        attrs += [("width", meta["width"]), ("height", meta["height"])]
+    if css_class:
+        attrs.append(("class", css_class))
+
+    if not variants:
+        return format_html("<img {}>", format_html_join(" ", '{}="{}"', attrs))
+
+    attrs += [("srcset", _srcset(variants, "original")), ("sizes", sizes)]
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}"><img {}></picture>',
+        _srcset(variants, "webp"),
+        sizes,
+        format_html_join(" ", '{}="{}"', attrs),
+    )
+
+
+@register.simple_tag
+def image_set(name, width=None):
+    """
+    CSS ``image-set()`` for a background image: WebP first, original format
+    as fallback, at the smallest variant at least ``width`` px wide.
+
+        background-image: {% image_set "images/login-bg.png" width=960 %};
+    """
+    meta = image_metadata(name) or {}
+    variants = meta.get("variants", [])
+    if not variants:
+        return format_html('url("{}")', static(name))
+
+    wanted = int(width or meta["width"])
+    variant = next((v for v in variants if v["width"] >= wanted), variants[-1])
+    return format_html(
+        'image-set(url("{}") type("image/webp"), url("{}") type("image/{}"))',
+        static(variant["webp"]),
+        static(variant["original"]),
+        "png" if name.lower().endswith(".png") else "jpeg",
+    )
@@ -1,3 +1,387 @@
-from django.test import TestCase
+import inspect
+import json
+import re
+import tempfile
+from datetime import timedelta
+from importlib import import_module
+from pathlib import Path
+from unittest.mock import patch
 
-# Create your tests here.
+from PIL import Image
+
+from django.db import connection
+from django.contrib.auth import SESSION_KEY, get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from django.urls import include, path, reverse
+
+from config.query_budget import budget_for
+from config.storage import RESPONSIVE_IMAGES_MANIFEST
+from config.testing import TEST_STORAGES, SeededTestCase
+from courses.management.commands.seed_scale import SEED_PASSWORD
+from . import async_views
+from .models import OutboundEmail
+from config.metrics import registry
+from .page_cache import CSRF_PLACEHOLDER, _page_key
+from .throttling import check_throttle
+from .outbox import LocmemTransport, RETENTION, enqueue_email, process_batch, purge_finished
+
+User = get_user_model()
+
+def username_iexact(sql, plan):
+    """The signup form's username__iexact check: LIKE on SQLite, which can't use the Upper(username) index."""
+    return "LIKE" in sql and '"username"' in sql
+
+
+BUDGETED_MODULES = ("courses.views", "user.views", "user.async_views", "accounts.views")
+
+
+class QueryBudgetDeclarationTests(SeededTestCase):
+    def test_every_view_declares_a_budget(self):
+        for module_name in BUDGETED_MODULES:
+            module = import_module(module_name)
+            for name, func in inspect.getmembers(module, inspect.isfunction):
+                if func.__module__ != module_name or name.startswith("_"):
+                    continue
+                params = list(inspect.signature(func).parameters)
+                if params[:1] == ["request"]:
+                    self.assertIsNotNone(budget_for(func), f"{module_name}.{name} has no @query_budget")
+
+
+class UserViewBudgetTests(SeededTestCase):
+    def pending_client(self, user):
+        client = Client()
+        session = client.session
+        session["pending_user_id"] = user.pk
+        session.save()
+        return client
+
+    def test_home(self):
+        self.assertWithinBudget(Client(), reverse("home"))
+        self.assertWithinBudget(self.student_client, reverse("home"))
+
+    def test_student_login(self):
+        self.assertWithinBudget(Client(), reverse("student_login"))
+        self.assertWithinBudget(
+            Client(),
+            reverse("student_login"),
+            method="post",
+            data={"username": self.student.username, "password": SEED_PASSWORD},
+        )
+
+    def test_student_signup(self):
+        self.assertWithinBudget(Client(), reverse("student_signup"))
+        self.assertWithinBudget(
+            Client(),
+            reverse("student_signup"),
+            method="post",
+            data={
+                "username": "budget-new-student",
+                "first_name": "New",
+                "last_name": "Student",
+                "email": "budget-new-student@example.com",
+                "password1": "budget-Pass-1234",
+                "password2": "budget-Pass-1234",
+            },
+            # username__iexact is indexed on Postgres only (Upper(username))
+            allowed_scans=() if connection.vendor == "postgresql" else (username_iexact,),
+        )
+
+    def test_student_verify(self):
+        self.student.is_authorized = False
+        self.student.set_verification_code("123456")
+        self.student.save()
+
+        client = self.pending_client(self.student)
+        self.assertWithinBudget(client, reverse("student_verify"))
+        self.assertWithinBudget(client, reverse("student_verify"), method="post", data={"code": "123456"})
+
+    def test_resend_code(self):
+        self.assertWithinBudget(self.pending_client(self.student), reverse("resend_code"))
+
+    def test_student_dashboard(self):
+        self.assertWithinBudget(self.student_client, reverse("student_dashboard"))
+        self.assertWithinBudget(self.student_client, reverse("student_dashboard") + "?course=english")
+
+    def test_student_logout(self):
+        self.assertWithinBudget(self.student_client, reverse("student_logout"))
+
+
+class OutboxTests(TestCase):
+    def test_body_blanked_once_sent_and_old_rows_purged(self):
+        email = enqueue_email("student@example.com", "Your code", "Your code is 123456")
+        self.assertEqual(process_batch(transport=LocmemTransport()), (1, 0))
+        self.assertEqual(LocmemTransport.outbox[-1].to_email, "student@example.com")
+
+        email.refresh_from_db()
+        self.assertEqual((email.status, email.body), (OutboundEmail.STATUS_SENT, ""))
+
+        self.assertEqual(purge_finished(), 0)
+        self.assertEqual(purge_finished(now=timezone.now() + RETENTION + timedelta(minutes=1)), 1)
+
+
+@override_settings(THROTTLE_RATES={"student_login": (3, 86400), "student_login_ip": (5, 86400)})
+class ThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def login_attempt(self, username):
+        request = RequestFactory().post("/", {"username": username}, REMOTE_ADDR="10.0.0.1")
+        return check_throttle(request, "student_login", per_field="username")
+
+    def test_login_limits_per_username_then_per_ip(self):
+        self.assertEqual([bool(self.login_attempt("ana")) for _ in range(4)], [False, False, False, True])
+        # same NAT, other students: only the higher whole-IP limit applies
+        self.assertFalse(self.login_attempt("ben"))
+        self.assertTrue(self.login_attempt("carla"))
+
+
+# ROOT_URLCONF of AsyncAuthViewTests: the routes ASYNC_AUTH_VIEWS=true installs
+urlpatterns = [
+    path("student/login/", async_views.student_login, name="student_login"),
+    path("student/signup/", async_views.student_signup, name="student_signup"),
+    path("student/verify/", async_views.student_verify, name="student_verify"),
+    path("student/resend-code/", async_views.resend_code, name="resend_code"),
+    path("", include("config.urls")),
+]
+
+
+@override_settings(
+    ROOT_URLCONF="user.tests",
+    STORAGES=TEST_STORAGES,
+    THROTTLE_RATES={
+        "student_login": (3, 86400),
+        "student_login_ip": (100, 86400),
+        "student_verify": (3, 86400),
+        "resend_code": (2, 86400),
+    },
+)
+class AsyncAuthViewTests(TransactionTestCase):
+    # ✅ committed rows: password hashing (authenticate) runs in the hash pool's own threads
+    PASSWORD = "a-long-Pass-phrase-9"
+    SIGNUP = {
+        "username": "async-ana",
+        "first_name": "Ana",
+        "last_name": "Lopez",
+        "email": "Ana@Example.com",
+        "password1": PASSWORD,
+        "password2": PASSWORD,
+    }
+
+    def setUp(self):
+        cache.clear()
+
+    async def signup(self, code):
+        with patch("user.async_views.secrets.randbelow", return_value=code):
+            return await self.async_client.post(reverse("student_signup"), self.SIGNUP, secure=True)
+
+    async def resend(self, code):
+        with patch("user.async_views.secrets.randbelow", return_value=code):
+            return await self.async_client.get(reverse("resend_code"), secure=True)
+
+    async def verify(self, code):
+        return await self.async_client.post(reverse("student_verify"), {"code": code}, secure=True)
+
+    async def login(self, password):
+        return await self.async_client.post(
+            reverse("student_login"), {"username": "async-ana", "password": password}, secure=True
+        )
+
+    async def test_signup_verify_and_login(self):
+        response = await self.signup(123456)
+        self.assertRedirects(response, reverse("student_verify"), fetch_redirect_response=False)
+        user = await User.objects.aget(username="async-ana")
+        self.assertEqual(user.email, "ana@example.com")
+        self.assertFalse(user.is_authorized)
+        self.assertTrue(await OutboundEmail.objects.filter(to_email="ana@example.com").aexists())
+
+        self.assertContains(await self.verify("654321"), "Invalid or expired code.")
+
+        response = await self.verify("123456")
+        self.assertRedirects(response, reverse("student_dashboard"), fetch_redirect_response=False)
+        await user.arefresh_from_db()
+        self.assertTrue(user.is_authorized)
+
+        await self.async_client.alogout()
+        self.assertEqual((await self.login("wrong")).status_code, 200)
+        self.assertNotIn(SESSION_KEY, await self.async_client.asession())
+        response = await self.login(self.PASSWORD)
+        self.assertRedirects(response, reverse("student_dashboard"), fetch_redirect_response=False)
+
+    async def test_resend_replaces_the_code(self):
+        await self.signup(111111)
+        response = await self.resend(222222)
+        self.assertRedirects(response, reverse("student_verify"), fetch_redirect_response=False)
+        self.assertEqual(await OutboundEmail.objects.filter(to_email="ana@example.com").acount(), 2)
+
+        self.assertContains(await self.verify("111111"), "Invalid or expired code.")
+        response = await self.verify("222222")
+        self.assertRedirects(response, reverse("student_dashboard"), fetch_redirect_response=False)
+
+    async def test_throttled(self):
+        await self.signup(123456)
+        self.assertEqual([(await self.verify("000000")).status_code for _ in range(4)], [200, 200, 200, 429])
+        self.assertEqual([(await self.resend(123456)).status_code for _ in range(3)], [302, 302, 429])
+        self.assertEqual([(await self.login("wrong")).status_code for _ in range(4)], [200, 200, 200, 429])
+
+    async def test_verify_without_a_pending_signup(self):
+        response = await self.verify("123456")
+        self.assertRedirects(response, reverse("student_login"), fetch_redirect_response=False)
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class PageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_home_cached_per_path_and_varies_on_cookie(self):
+        response = self.client.get(reverse("home"), secure=True)
+        self.assertIn("Cookie", response["Vary"])
+        self.assertIn("public", response["Cache-Control"])
+        request = RequestFactory().get(reverse("home"))
+        self.assertIsNotNone(cache.get(_page_key(request)))
+
+    def csrf_token(self, response):
+        return re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', response.content.decode()).group(1)
+
+    def test_cached_page_gets_a_fresh_csrf_token_that_posts(self):
+        Client().get(reverse("student_login"), secure=True)
+        self.assertIsNotNone(cache.get(_page_key(RequestFactory().get(reverse("student_login")))))
+
+        visitor = Client(enforce_csrf_checks=True)
+        with patch("user.page_cache.store") as store:
+            response = visitor.get(reverse("student_login"), secure=True)
+        store.assert_not_called()
+        self.assertNotContains(response, CSRF_PLACEHOLDER)
+        self.assertIn("private", response["Cache-Control"])
+
+        User.objects.create_user(
+            "cached-login", "cached-login@example.com", "pw", is_student=True, is_authorized=True
+        )
+        response = visitor.post(
+            reverse("student_login"),
+            {"username": "cached-login", "password": "pw", "csrfmiddlewaretoken": self.csrf_token(response)},
+            secure=True,
+            # https: CsrfViewMiddleware checks the Referer too
+            HTTP_REFERER="https://testserver" + reverse("student_login"),
+        )
+        self.assertRedirects(response, reverse("student_dashboard"), fetch_redirect_response=False)
+
+    def test_if_none_match_gets_304_only_with_the_same_csrf_cookie(self):
+        response = self.client.get(reverse("student_login"), secure=True)
+        etag = response["ETag"]
+
+        response = self.client.get(reverse("student_login"), secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        # another visitor's cookie: the copy's token wouldn't match it, so a full page
+        response = Client().get(reverse("student_login"), secure=True, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_query_string_bypasses_the_cache(self):
+        response = self.client.get(reverse("home") + "?anything=1", secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("ETag", response)
+        self.assertIsNone(cache.get(_page_key(RequestFactory().get(reverse("home")))))
+
+
+class ResponsiveImagesTests(SimpleTestCase):
+    def test_collectstatic_writes_webp_variants(self):
+        with tempfile.TemporaryDirectory() as source, tempfile.TemporaryDirectory() as root:
+            (Path(source) / "images").mkdir()
+            Image.new("RGB", (600, 300), "teal").save(Path(source) / "images" / "banner.png")
+            storages = {**TEST_STORAGES, "staticfiles": {"BACKEND": "config.storage.ResponsiveImagesStorage"}}
+            with override_settings(STATICFILES_DIRS=[source], STATIC_ROOT=root, STORAGES=storages):
+                call_command("collectstatic", interactive=False, ignore_patterns=["admin"], verbosity=0)
+
+            metadata = json.loads((Path(root) / RESPONSIVE_IMAGES_MANIFEST).read_text())
+            entry = metadata["images/banner.png"]
+            self.assertEqual((entry["width"], entry["height"]), (600, 300))
+            # every configured width below 600, then the full size
+            self.assertEqual([v["width"] for v in entry["variants"]], [80, 240, 480, 600])
+            self.assertEqual(entry["variants"][-1], {"width": 600, "webp": "images/banner.webp", "original": "images/banner.png"})
+
+            with Image.open(Path(root) / "images" / "banner.w240.webp") as webp:
+                self.assertEqual((webp.format, webp.size), ("WEBP", (240, 120)))
+            with Image.open(Path(root) / "images" / "banner.w240.png") as png:
+                self.assertEqual((png.format, png.size), ("PNG", (240, 120)))
+            # hashed by the manifest storage like any other static file
+            manifest = json.loads((Path(root) / "staticfiles.json").read_text())["paths"]
+            self.assertIn("images/banner.w480.webp", manifest)
+
+    def render(self, snippet):
+        return Template("{% load responsive_images %}" + snippet).render(Context())
+
+    @override_settings(STORAGES=TEST_STORAGES)
+    def test_image_set_picks_the_smallest_wide_enough_variant(self):
+        metadata = {
+            "images/hero.jpg": {
+                "width": 1000,
+                "height": 500,
+                "variants": [
+                    {"width": 480, "webp": "images/hero.w480.webp", "original": "images/hero.w480.jpg"},
+                    {"width": 960, "webp": "images/hero.w960.webp", "original": "images/hero.w960.jpg"},
+                    {"width": 1000, "webp": "images/hero.webp", "original": "images/hero.jpg"},
+                ],
+            }
+        }
+        with patch("user.templatetags.responsive_images._collected_metadata", return_value=metadata):
+            self.assertEqual(
+                self.render('{% image_set "images/hero.jpg" width=500 %}'),
+                'image-set(url("/static/images/hero.w960.webp") type("image/webp"), '
+                'url("/static/images/hero.w960.jpg") type("image/jpeg"))',
+            )
+            # no width: the full-size image
+            self.assertIn('url("/static/images/hero.webp")', self.render('{% image_set "images/hero.jpg" %}'))
+            # wider than any variant: the largest there is
+            self.assertIn('url("/static/images/hero.jpg")', self.render('{% image_set "images/hero.jpg" width=4000 %}'))
+
+    @override_settings(STORAGES=TEST_STORAGES)
+    def test_image_set_without_variants_is_a_plain_url(self):
+        with patch("user.templatetags.responsive_images._collected_metadata", return_value={}):
+            # found by the finders (not collected) and not found at all
+            self.assertEqual(
+                self.render('{% image_set "images/login-bg.png" width=960 %}'), 'url("/static/images/login-bg.png")'
+            )
+            self.assertEqual(self.render('{% image_set "images/missing.png" %}'), 'url("/static/images/missing.png")')
+
+
+@override_settings(STORAGES=TEST_STORAGES)
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_server_timing_for_staff_only(self):
+        self.assertNotIn("Server-Timing", self.client.get(reverse("student_login"), secure=True))
+
+        staff = User.objects.create_user("metrics-staff", "metrics-staff@example.com", "pw", is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(reverse("metrics"), secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('desc="', response["Server-Timing"])
+
+    def test_template_time_and_series_reach_metrics(self):
+        self.client.get(reverse("student_login"), secure=True)
+        snapshot = registry.snapshot()
+        self.assertGreater(snapshot[("count", "student_login", "")], 0)
+        self.assertGreater(snapshot[("template_sum_us", "student_login", "")], 0)
+
+    def test_every_series_is_typed(self):
+        staff = User.objects.create_user("metrics-types", "metrics-types@example.com", "pw", is_staff=True)
+        self.client.force_login(staff)
+        pool = {"default": {"size": 4, "in_use": 1, "waiting": 0, "checkout_wait_ms_avg": 0.5, "checkout_timeouts": 2}}
+        with patch("config.db_pool.pool_stats", return_value=pool):
+            body = self.client.get(reverse("metrics"), secure=True).content.decode()
+
+        self.assertIn("metrics_cache_shared 0", body)
+        self.assertIn("# TYPE db_pool_size gauge", body)
+        self.assertIn("# TYPE db_pool_checkout_timeouts counter", body)
+        typed = {line.split()[2] for line in body.splitlines() if line.startswith("# TYPE")}
+        for line in body.splitlines():
+            if line and not line.startswith("#"):
+                name = line.split("{")[0].split()[0]
+                self.assertTrue(name in typed or name.rsplit("_", 1)[0] in typed, name)
@@ -0,0 +1,158 @@
+"""
+Rate limiting for the auth endpoints: fixed-window counters in the Django
+cache, bumped with add/incr so parallel requests can't read the same count
+and all slip through.
+
+Each request is counted against one window per identity it carries
+(session key, pending_user_id, client IP); if any is over its limit the
+request gets a 429 with Retry-After. ``per_field`` endpoints (login) count
+the IP per submitted username instead, plus a much higher whole-IP limit
+(``<endpoint>_ip``), so a school behind one NAT isn't locked out together.
+"""
+import functools
+import math
+import time
+from inspect import iscoroutinefunction
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+# endpoints wrapped with @throttle (for throttle_counters)
+ENDPOINTS = set()
+
+
+def get_rate(endpoint):
+    """(requests, per seconds) from settings.THROTTLE_RATES, or None if unlimited."""
+    return settings.THROTTLE_RATES.get(endpoint)
+
+
+def client_ip(request):
+    if getattr(settings, "THROTTLE_USE_X_FORWARDED_FOR", False):
+        forwarded = request.META.get("HTTP_X_FORWARDED_FOR", "")
+        if forwarded:
+            # ✅ the proxy appends the real peer, so trust the right-most entry only
+            return forwarded.split(",")[-1].strip()
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def buckets(request, endpoint, per_field=None):
+    """Yield (key, rate) for every limit this request counts against."""
+    rate = get_rate(endpoint)
+    session = getattr(request, "session", None)
+    if session is not None:
+        if session.session_key:
+            yield f"{endpoint}:session:{session.session_key}", rate
+        pending_user_id = session.get("pending_user_id")
+        if pending_user_id:
+            yield f"{endpoint}:user:{pending_user_id}", rate
+
+    ip = client_ip(request)
+    if not ip:
+        return
+    if per_field is None:
+        yield f"{endpoint}:ip:{ip}", rate
+        return
+
+    value = request.POST.get(per_field, "").strip().lower()
+    yield f"{endpoint}:ip:{ip}:{per_field}:{value}", rate
+    yield f"{endpoint}:ip:{ip}", get_rate(f"{endpoint}_ip")
+
+
+def _hit(key, rate, now):
+    """Count one request; returns 0 if within the limit, else seconds until the window resets."""
+    if rate is None:
+        return 0
+    capacity, period = rate
+    window_key = f"throttle:{key}:{int(now // period)}"
+
+    # ✅ add/incr are atomic in Redis and LocMemCache; get-then-set is not
+    if cache.add(window_key, 1, period + 1):
+        count = 1
+    else:
+        try:
+            count = cache.incr(window_key)
+        except ValueError:
+            # expired between add() and incr()
+            cache.add(window_key, 1, period + 1)
+            count = 1
+
+    if count > capacity:
+        return period - now % period
+    return 0
+
+
+def _count(endpoint, outcome):
+    key = f"throttle:count:{endpoint}:{outcome}"
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+def check_throttle(request, endpoint, per_field=None):
+    """Returns 0 if the request may proceed, else the Retry-After in seconds."""
+    now = time.time()
+
+    wait = max((_hit(key, rate, now) for key, rate in buckets(request, endpoint, per_field)), default=0)
+    _count(endpoint, "throttled" if wait else "allowed")
+    return wait
+
+
+def too_many_requests(wait):
+    response = HttpResponse("Too many requests. Please try again shortly.", status=429)
+    response["Retry-After"] = str(math.ceil(wait))
+    return response
+
+
+def throttle(endpoint, methods=None, per_field=None):
+    """
+    View decorator. ``methods`` limits throttling to e.g. ("POST",);
+    by default every request counts. ``per_field`` keys the IP limit on that
+    POST field too (see module docstring). Works on sync and async views.
+    """
+    ENDPOINTS.add(endpoint)
+
+    def applies(request):
+        return methods is None or request.method in methods
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @functools.wraps(view)
+            async def wrapper(request, *args, **kwargs):
+                if applies(request):
+                    wait = await sync_to_async(check_throttle)(request, endpoint, per_field)
+                    if wait:
+                        return too_many_requests(wait)
+                return await view(request, *args, **kwargs)
+
+        else:
+
+            @functools.wraps(view)
+            def wrapper(request, *args, **kwargs):
+                if applies(request):
+                    wait = check_throttle(request, endpoint, per_field)
+                    if wait:
+                        return too_many_requests(wait)
+                return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def throttle_counters():
+    """{endpoint: {"allowed": n, "throttled": n}} since the cache was last cleared."""
+    keys = {
+        f"throttle:count:{endpoint}:{outcome}": (endpoint, outcome)
+        for endpoint in sorted(ENDPOINTS)
+        for outcome in ("allowed", "throttled")
+    }
+    values = cache.get_many(keys)
+    counters = {endpoint: {"allowed": 0, "throttled": 0} for endpoint in sorted(ENDPOINTS)}
+    for key, (endpoint, outcome) in keys.items():
+        counters[endpoint][outcome] = values.get(key, 0)
+    return counters
@@ -1,12 +1,19 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# ✅ async login/signup/verify when served under ASGI (see README)
+if settings.ASYNC_AUTH_VIEWS:
+    from . import async_views as entry_views
+else:
+    entry_views = views
+
 urlpatterns = [
     path("", views.home, name="home"),  # ✅ this fixes "/"
-    path("student/login/", views.student_login, name="student_login"),
-    path("student/signup/", views.student_signup, name="student_signup"),
-    path("student/verify/", views.student_verify, name="student_verify"),
+    path("student/login/", entry_views.student_login, name="student_login"),
+    path("student/signup/", entry_views.student_signup, name="student_signup"),
+    path("student/verify/", entry_views.student_verify, name="student_verify"),
     path("student/dashboard/", views.student_dashboard, name="student_dashboard"),
     path("student/logout/", views.student_logout, name="student_logout"),
-    path("student/resend-code/", views.resend_code, name="resend_code"),
+    path("student/resend-code/", entry_views.resend_code, name="resend_code"),
 ]
@@ -1,22 +1,23 @@
 import secrets
 import logging
 
-from django.conf import settings
 from django.contrib.auth import authenticate, login, logout, get_user_model
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.http import HttpResponseForbidden
 from django.shortcuts import render, redirect
 
-from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail
-
+from config.query_budget import query_budget
 from .forms import StudentSignUpForm, VerifyCodeForm
+from .page_cache import anonymous_page_cache
+from .throttling import throttle
+from .outbox import enqueue_email
 
 User = get_user_model()
 logger = logging.getLogger(__name__)
 
 
-def safe_send_verification_email(user, code, subject):
+def queue_verification_email(user, code, subject):
     message_text = (
         f"Hi {user.first_name or 'there'},\n\n"
         "Thank you for signing up for Vantage Lingua Hub! 🎉\n\n"
@@ -28,28 +29,22 @@ def safe_send_verification_email(user, code, subject):
         "Vantage Lingua Hub Team"
     )
 
-    try:
-        if not settings.SENDGRID_API_KEY:
-            raise ValueError("SENDGRID_API_KEY not set")
-        if not settings.DEFAULT_FROM_EMAIL:
-            raise ValueError("DEFAULT_FROM_EMAIL not set")
-
-        sg = SendGridAPIClient(settings.SENDGRID_API_KEY)
-        mail = Mail(
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            to_emails=user.email,
-            subject=subject,
-            plain_text_content=message_text,
-        )
-        sg.send(mail)
-        return True
+    # ✅ delivered by `manage.py run_outbox`, never inside the request; the
+    # body (with the code) is blanked once the row is sent or given up on
+    enqueue_email(to_email=user.email, subject=subject, body=message_text, user=user)
 
-    except Exception as e:
-        logger.exception("SendGrid send failed: %s", e)
-        print(f"TEMP VERIFY CODE for {user.email} is: {code}")
-        return False
+
+def save_with_verification_email(user, code, subject, update_fields=None):
+    # ✅ user row + queued email commit together (an enqueue failure rolls both back)
+    user.set_verification_code(code, minutes_valid=10)
+    with transaction.atomic():
+        user.save(update_fields=update_fields)
+        queue_verification_email(user=user, code=code, subject=subject)
 
 
+@query_budget(9)
+@anonymous_page_cache
+@throttle("student_login", methods=("POST",), per_field="username")
 def student_login(request):
     error = None
 
@@ -78,6 +73,8 @@ def student_login(request):
     return render(request, "accounts/student_login.html", {"error": error})
 
 
+@query_budget(10)
+@anonymous_page_cache
 def student_signup(request):
     if request.user.is_authenticated:
         return redirect("student_dashboard")
@@ -95,28 +92,24 @@ def student_signup(request):
         user.is_student = True
         user.is_authorized = False
 
-        user.set_password(form.cleaned_data["password1"])
-        user.save()
+        # ✅ form.save() already hashed password1, no second PBKDF2 round here
 
         code = f"{secrets.randbelow(10**6):06d}"
-        print(f"SIGNUP VERIFY CODE for {user.email} is: {code}")
 
-        user.set_verification_code(code, minutes_valid=10)
-        user.save()
-
-        sent = safe_send_verification_email(
-            user=user,
-            code=code,
+        save_with_verification_email(
+            user,
+            code,
             subject="Welcome to Vantage Lingua Hub – Verify Your Account",
         )
 
         request.session["pending_user_id"] = user.id
-        request.session["email_sent"] = sent
         return redirect("student_verify")
 
     return render(request, "accounts/student_signup.html", {"form": form})
 
 
+@query_budget(13)
+@throttle("student_verify", methods=("POST",))
 def student_verify(request):
     user_id = request.session.get("pending_user_id")
     if not user_id:
@@ -140,7 +133,6 @@ def student_verify(request):
 
             login(request, user)
             request.session.pop("pending_user_id", None)
-            request.session.pop("email_sent", None)
             return redirect("student_dashboard")
 
         error = "Invalid or expired code."
@@ -152,11 +144,12 @@ def student_verify(request):
             "form": form,
             "error": error,
             "email": user.email,
-            "email_sent": request.session.get("email_sent", True),
         },
     )
 
 
+@query_budget(9)
+@throttle("resend_code")
 def resend_code(request):
     user_id = request.session.get("pending_user_id")
     if not user_id:
@@ -167,21 +160,18 @@ def resend_code(request):
         return redirect("student_login")
 
     code = f"{secrets.randbelow(10**6):06d}"
-    print(f"RESEND VERIFY CODE for {user.email} is: {code}")
-
-    user.set_verification_code(code, minutes_valid=10)
-    user.save()
 
-    sent = safe_send_verification_email(
-        user=user,
-        code=code,
+    save_with_verification_email(
+        user,
+        code,
         subject="Vantage Lingua Hub – Your New Verification Code",
+        update_fields=["verification_code_hash", "verification_code_expires_at"],
     )
 
-    request.session["email_sent"] = sent
     return redirect("student_verify")
 
 
+@query_budget(5)
 @login_required
 def student_dashboard(request):
     if not request.user.is_student:
@@ -194,16 +184,20 @@ def student_dashboard(request):
     return render(request, "accounts/student_dashboard.html")
 
 
+@query_budget(4)
 def student_logout(request):
     logout(request)
     return redirect("student_login")
 
 
+@query_budget(2)
+@anonymous_page_cache
 def home(request):
     return render(request, "home.html")
 
 
 
+@query_budget(5)
 @login_required
 def student_dashboard(request):
     selected_course = request.GET.get("course", "").strip()